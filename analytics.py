@@ -0,0 +1,278 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import streamlit as st
+import database as db
+
+ANALYTICS_DIR = os.environ.get("ANALYTICS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analytics"))
+PAGE_SIZE = 1000
+# Rows that commit late can carry an updated_at just behind the watermark, so
+# each sync re-reads a short overlap (upserts make that harmless)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# How long the database keeps deletes-log entries; a snapshot that hasn't
+# synced for longer may have missed deletes, so it rebuilds instead
+DELETES_RETENTION = timedelta(days=30)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS transactions (
+        id VARCHAR PRIMARY KEY,
+        user_id VARCHAR,
+        category_id VARCHAR,
+        amount DECIMAL(15, 2),
+        description VARCHAR,
+        is_annie_related BOOLEAN,
+        date DATE,
+        created_at TIMESTAMP,  -- UTC
+        archived BOOLEAN
+    )""",
+    # Added after the first snapshots were built; those rebuild once to pick it up
+    "ALTER TABLE transactions ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+    """CREATE TABLE IF NOT EXISTS categories (
+        id VARCHAR PRIMARY KEY,
+        name VARCHAR,
+        monthly_budget DECIMAL(15, 2),
+        is_fixed BOOLEAN
+    )""",
+    """CREATE TABLE IF NOT EXISTS profiles (
+        id VARCHAR PRIMARY KEY,
+        display_name VARCHAR
+    )""",
+    """CREATE TABLE IF NOT EXISTS sync_state (
+        id INTEGER PRIMARY KEY,
+        watermark VARCHAR,
+        synced_at TIMESTAMP,
+        rebuilt_at TIMESTAMP
+    )""",
+    "ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS deletes_watermark VARCHAR",
+]
+
+EXAMPLE_QUERIES = {
+    "Annie cost per quarter": """SELECT year(date) AS year, quarter(date) AS quarter, SUM(amount) AS annie_total
+FROM transactions
+WHERE is_annie_related
+GROUP BY ALL
+ORDER BY year, quarter""",
+    "Category growth year over year": """WITH yearly AS (
+  SELECT coalesce(c.name, 'Other') AS category, year(t.date) AS year, SUM(t.amount) AS total
+  FROM transactions t LEFT JOIN categories c ON c.id = t.category_id
+  GROUP BY ALL
+)
+SELECT category, year, total,
+       total - lag(total) OVER (PARTITION BY category ORDER BY year) AS growth
+FROM yearly
+ORDER BY growth DESC NULLS LAST""",
+    "Spending by member per month": """SELECT strftime(date, '%Y-%m') AS month, coalesce(p.display_name, 'Unknown') AS member,
+       SUM(amount) AS total
+FROM transactions t LEFT JOIN profiles p ON p.id = t.user_id
+GROUP BY ALL
+ORDER BY month DESC, total DESC""",
+    "Largest transactions": """SELECT date, amount, description
+FROM transactions
+ORDER BY amount DESC
+LIMIT 20""",
+}
+
+
+class QueryError(ValueError):
+    """Raised for SQL the analytics snapshot refuses to run."""
+
+
+def _utc(timestamp: str):
+    """Supabase timestamptz string as a naive UTC datetime."""
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _snapshot_path(household_id: str) -> str:
+    return os.path.join(ANALYTICS_DIR, f"{household_id}.duckdb")
+
+
+def _fetch_all(fetch, client, household_id: str, since: str) -> list:
+    """Every row of a paged database read after a watermark."""
+    rows, offset = [], 0
+    while True:
+        page = fetch(client, household_id, since, offset, PAGE_SIZE)
+        rows += page
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+class AnalyticsSnapshot:
+    """Local DuckDB copy of one household's transactions, categories and profiles.
+
+    Transactions sync incrementally: rows added or edited since the updated_at
+    watermark are upserted, and entries in the database's deletes log remove
+    rows (or flag rows moved to the archive). Categories and profiles are small
+    and refreshed in full. Each household gets its own file, so ad-hoc SQL can
+    only see that household's data.
+    """
+
+    def __init__(self, household_id: str, path: str = None):
+        import duckdb
+
+        self.household_id = household_id
+        self.path = path or _snapshot_path(household_id)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # No file, network or extension access from queries, and no SET to re-enable it
+        self._con = duckdb.connect(self.path, config={"enable_external_access": False, "lock_configuration": True})
+        self._select = duckdb.StatementType.SELECT
+        self._lock = threading.Lock()
+        for statement in SCHEMA:
+            self._con.execute(statement)
+
+    def _state(self, con):
+        row = con.execute(
+            "SELECT watermark, synced_at, rebuilt_at, deletes_watermark FROM sync_state WHERE id = 1"
+        ).fetchone()
+        return row or (None, None, None, None)
+
+    def _upsert_transactions(self, rows, archived: bool = False):
+        if not rows:
+            return
+        self._con.executemany(
+            "INSERT OR REPLACE INTO transactions (id, user_id, category_id, amount, description, "
+            "is_annie_related, date, created_at, archived, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(r["id"], r.get("user_id"), r.get("category_id"), r["amount"], r.get("description"),
+              bool(r.get("is_annie_related")), r.get("date"),
+              _utc(r["created_at"]) if r.get("created_at") else None, archived,
+              _utc(r["updated_at"]) if r.get("updated_at") else None) for r in rows]
+        )
+
+    def _apply_deletes(self, deletes):
+        """Drop deleted rows and flag archived ones, unless the row changed again afterwards."""
+        for flag_archived, statement in ((False, "DELETE FROM transactions"),
+                                         (True, "UPDATE transactions SET archived = TRUE")):
+            params = [(d["id"], _utc(d["deleted_at"])) for d in deletes if bool(d.get("archived")) == flag_archived]
+            if params:
+                self._con.executemany(
+                    f"{statement} WHERE id = ? AND (updated_at IS NULL OR updated_at < ?)", params
+                )
+
+    def _needs_rebuild(self, watermark, deletes_watermark) -> bool:
+        """Whether deletes may have been missed: never rebuilt since tracking began, or idle past retention."""
+        if not watermark or not deletes_watermark:
+            return True
+        return datetime.now(timezone.utc) - datetime.fromisoformat(deletes_watermark) > DELETES_RETENTION
+
+    def sync(self, client, rebuild: bool = False) -> int:
+        """Apply changes since the last sync (copy everything on rebuild). Returns rows copied."""
+        with self._lock:
+            watermark, _, rebuilt_at, deletes_watermark = self._state(self._con)
+            rebuild = rebuild or self._needs_rebuild(watermark, deletes_watermark)
+            # Deletes logged from here on are applied by the next sync
+            started = datetime.now(timezone.utc).isoformat()
+
+            since, deletes = None, []
+            if not rebuild:
+                since = (datetime.fromisoformat(watermark) - WATERMARK_OVERLAP).isoformat()
+                deletes_since = (datetime.fromisoformat(deletes_watermark) - WATERMARK_OVERLAP).isoformat()
+                deletes = _fetch_all(db.get_transaction_deletes_page, client, self.household_id, deletes_since)
+            rows = _fetch_all(db.get_transactions_page, client, self.household_id, since)
+            categories = db.load_categories(client, self.household_id) or []
+            profiles = db.get_all_profiles(client, self.household_id) or []
+
+            self._con.begin()
+            try:
+                if rebuild:
+                    self._con.execute("DELETE FROM transactions")
+                    self._upsert_transactions(
+                        db.get_archived_transactions(client, self.household_id, "1900-01-01", "9999-12-31"),
+                        archived=True
+                    )
+                    rebuilt_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                self._upsert_transactions(rows)
+                self._apply_deletes(deletes)
+                self._con.execute("DELETE FROM categories")
+                if categories:
+                    self._con.executemany("INSERT INTO categories VALUES (?, ?, ?, ?)", [
+                        (c["id"], c["name"], c.get("monthly_budget"), bool(c.get("is_fixed"))) for c in categories
+                    ])
+                self._con.execute("DELETE FROM profiles")
+                if profiles:
+                    self._con.executemany("INSERT INTO profiles VALUES (?, ?)", [
+                        (p["id"], p["display_name"]) for p in profiles
+                    ])
+                if rows:
+                    watermark = max((r["updated_at"] for r in rows), key=_utc)
+                elif rebuild:
+                    watermark = started
+                self._con.execute(
+                    "INSERT OR REPLACE INTO sync_state (id, watermark, synced_at, rebuilt_at, deletes_watermark) "
+                    "VALUES (1, ?, ?, ?, ?)",
+                    [watermark, datetime.now(timezone.utc).replace(tzinfo=None), rebuilt_at, started]
+                )
+                self._con.commit()
+            except Exception:
+                self._con.rollback()
+                raise
+            return len(rows)
+
+    def query(self, sql: str, params: list = None):
+        """Run one read-only SELECT and return (DataFrame, elapsed ms)."""
+        cursor = self._con.cursor()
+        try:
+            statements = cursor.extract_statements(sql)
+            if len(statements) != 1 or statements[0].type != self._select:
+                raise QueryError("Only a single SELECT query is allowed")
+            start = time.perf_counter()
+            frame = cursor.execute(sql, params or []).df()
+            return frame, (time.perf_counter() - start) * 1000
+        except QueryError:
+            raise
+        except Exception as e:
+            raise QueryError(str(e)) from e
+        finally:
+            cursor.close()
+
+    def status(self):
+        """Row count, watermark and last sync/rebuild times."""
+        cursor = self._con.cursor()
+        try:
+            watermark, synced_at, rebuilt_at, _ = self._state(cursor)
+            rows = cursor.execute("SELECT count(*) FROM transactions").fetchone()[0]
+        finally:
+            cursor.close()
+        return {"rows": rows, "watermark": watermark, "synced_at": synced_at, "rebuilt_at": rebuilt_at}
+
+    def tables(self):
+        """Column names and types of every queryable table."""
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(
+                "SELECT table_name, column_name, data_type FROM information_schema.columns "
+                "WHERE table_name <> 'sync_state' ORDER BY table_name, ordinal_position"
+            ).fetchall()
+        finally:
+            cursor.close()
+
+
+@st.cache_resource
+def get_snapshot(household_id: str):
+    """Get the process-wide analytics snapshot for a household."""
+    return AnalyticsSnapshot(household_id)
+
+
+def _snapshot_household_ids(client) -> list:
+    """Households with a snapshot on disk, i.e. that have opened Analytics."""
+    return [household_id for household_id in db.get_household_ids(client)
+            if os.path.exists(_snapshot_path(household_id))]
+
+
+def sync_all_households(client) -> int:
+    """Sync every existing snapshot and purge expired deletes-log entries (scheduled). Returns rows copied."""
+    copied = sum(get_snapshot(household_id).sync(client) for household_id in _snapshot_household_ids(client))
+    db.purge_transaction_deletes(client, (datetime.now(timezone.utc) - DELETES_RETENTION).isoformat())
+    return copied
+
+
+def query(client, household_id: str, sql: str, params: list = None, max_age: float = 300):
+    """Run SQL against a household's snapshot, syncing first if it is older than max_age seconds.
+
+    Returns (DataFrame, elapsed ms). Raises QueryError for anything but one SELECT.
+    """
+    snapshot = get_snapshot(household_id)
+    synced_at = snapshot.status()["synced_at"]
+    if synced_at is None or (datetime.now(timezone.utc).replace(tzinfo=None) - synced_at).total_seconds() > max_age:
+        snapshot.sync(client)
+    return snapshot.query(sql, params)
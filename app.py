@@ -1,6 +1,8 @@
 import streamlit as st
-from database import get_connection, get_profile, create_profile
+from database import get_connection, get_profile, create_profile, create_household, get_household, get_household_by_invite_code
 from auth import require_login, logout
+from scheduler import get_scheduler
+from components import render_budget_alerts
 
 st.set_page_config(page_title="Annie Budget", page_icon="💰")
 
@@ -26,10 +28,15 @@ st.markdown("""
 # Initialize connection and authenticate
 conn = get_connection()
 client = conn.client
+
+# Start background maintenance (once per process)
+get_scheduler(client)
 user = require_login(client)
 
-# Check if user has a profile, create one if not
-profile = get_profile(client, user.id)
+# Check if user has a profile, create one if not (looked up once per session)
+profile = st.session_state.get("profile")
+if not profile or profile.get("id") != user.id:
+    profile = get_profile(client, user.id)
 
 if not profile:
     # Hide sidebar on profile setup page
@@ -48,31 +55,52 @@ if not profile:
 
     with st.form("profile_form"):
         display_name = st.text_input("Your Name", value=default_name)
+        household_code = st.text_input(
+            "Household code (optional)",
+            help="Paste the code shown in a family member's sidebar to join their household. "
+                 "Leave empty to start a new household."
+        )
         submitted = st.form_submit_button("Save Profile", type="primary")
         if submitted:
             if display_name:
                 try:
-                    create_profile(client, user.id, display_name)
-                    if "pending_display_name" in st.session_state:
-                        del st.session_state["pending_display_name"]
-                    st.rerun()
+                    if household_code.strip():
+                        household = get_household_by_invite_code(client, household_code.strip().lower())
+                        household_id = household["id"] if household else None
+                    else:
+                        household_id = create_household(client, f"{display_name}'s household")
+                    if household_id:
+                        create_profile(client, user.id, display_name, household_id)
+                        if "pending_display_name" in st.session_state:
+                            del st.session_state["pending_display_name"]
+                        st.rerun()
+                    else:
+                        st.error("Household not found. Check the code.")
                 except Exception as e:
                     st.error(f"Error creating profile: {e}")
             else:
                 st.error("Name is required.")
     st.stop()
 
+household = st.session_state.get("household")
+if not household or household["id"] != profile["household_id"]:
+    household = get_household(client, profile["household_id"])
+
 # Store in session state for pages to access
 st.session_state["client"] = client
 st.session_state["user"] = user
 st.session_state["profile"] = profile
+st.session_state["household"] = household
+st.session_state["household_id"] = profile["household_id"]
 
 # User info in sidebar (visible on all pages)
 with st.sidebar:
     st.write(f"**{profile['display_name']}**")
     st.caption(user.email)
+    st.caption(f"Household code: `{household['invite_code']}`")
     if st.button("Logout"):
         logout(client)
+    render_budget_alerts(client, user, profile["household_id"], profile)
     st.divider()
 
 # Navigation
@@ -80,6 +108,10 @@ pages = [
     st.Page("pages/0_Add_Transaction.py", title="Add Transaction", icon="➕"),
     st.Page("pages/1_Monthly_Transactions.py", title="Monthly Transactions", icon="📅"),
     st.Page("pages/2_Manage_Categories.py", title="Manage Categories", icon="⚙️"),
+    st.Page("pages/3_Search.py", title="Search", icon="🔍"),
+    st.Page("pages/4_Trends.py", title="Trends", icon="📈"),
+    st.Page("pages/5_Recurring.py", title="Recurring", icon="🔁"),
+    st.Page("pages/6_Analytics.py", title="Analytics", icon="🧮"),
 ]
 
 nav = st.navigation(pages)
@@ -0,0 +1,49 @@
+from datetime import date
+import database as db
+
+# Years kept in the hot table besides the current one; older years are archived
+KEEP_CLOSED_YEARS = 1
+
+
+class ArchiveError(Exception):
+    """Raised when an archived year fails verification."""
+
+
+def archivable_years(client, household_id: str, today: date = None) -> list:
+    """Closed years old enough to archive that still have rows in the hot table."""
+    today = today or date.today()
+    oldest = db.get_oldest_transaction_date(client, household_id)
+    if not oldest:
+        return []
+    return list(range(date.fromisoformat(oldest).year, today.year - KEEP_CLOSED_YEARS))
+
+
+def archive_year(client, household_id: str, year: int) -> dict:
+    """Archive one closed year and verify it. Returns the archive result.
+
+    The move itself is atomic on the server. Verification compares archived
+    rows and summaries afterwards; a failure raises ArchiveError, and
+    restore_year() puts the rows back.
+    """
+    result = db.archive_year(client, household_id, year)
+    check = db.verify_archive(client, household_id, year)
+    if not check["ok"]:
+        raise ArchiveError(f"Archive for {year} failed verification: {check['mismatches']}")
+    db.load_archived_months.clear()
+    return result
+
+
+def restore_year(client, household_id: str, year: int) -> dict:
+    """Move an archived year back into the hot table."""
+    result = db.restore_year(client, household_id, year)
+    db.load_archived_months.clear()
+    return result
+
+
+def archive_closed_years(client) -> int:
+    """Archive every eligible year for every household (scheduled). Returns rows moved."""
+    moved = 0
+    for household_id in db.get_household_ids(client):
+        for year in archivable_years(client, household_id):
+            moved += archive_year(client, household_id, year)["rows"]
+    return moved
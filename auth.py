@@ -90,10 +90,19 @@ def get_user(client):
     return None
 
 
+def is_operator(user) -> bool:
+    """Whether a user may see and run process-wide maintenance jobs.
+
+    Operators are listed by email under `operators` in secrets.toml; jobs span
+    every household, so ordinary members never get them.
+    """
+    return user is not None and user.email in st.secrets.get("operators", [])
+
+
 def sign_up(client, email, password, display_name):
     """Register a new user with email and password."""
     try:
-        response = client.auth.sign_up({"email": email, "password": password})
+        response = db.get_auth_client().auth.sign_up({"email": email, "password": password})
         if response.user:
             if response.user.identities and len(response.user.identities) == 0:
                 st.error("This email is already registered. Please sign in.")
@@ -110,7 +119,7 @@ def sign_up(client, email, password, display_name):
 def sign_in(client, email, password):
     """Sign in with email and password."""
     try:
-        response = client.auth.sign_in_with_password({"email": email, "password": password})
+        response = db.get_auth_client().auth.sign_in_with_password({"email": email, "password": password})
         if response.user:
             # Create session token with email
             session_token = db.create_session(client, response.user.id, response.user.email)
@@ -150,12 +159,15 @@ def logout(client):
             del st.session_state["auth_user_email"]
         if "profile" in st.session_state:
             del st.session_state["profile"]
+        if "household_id" in st.session_state:
+            del st.session_state["household_id"]
+        if "household" in st.session_state:
+            del st.session_state["household"]
 
         # Clear cookie and query params
         clear_session_cookie()
         st.query_params.clear()
 
-        client.auth.sign_out()
         st.rerun()
     except Exception as e:
         st.error(f"Logout error: {e}")
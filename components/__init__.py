@@ -1,2 +1,5 @@
 from .budget import render_budget
 from .smart_input import render_smart_input
+from .usage_report import render_usage_report
+from .transaction_list import render_transaction_list
+from .alerts import render_budget_alerts
@@ -0,0 +1,32 @@
+import streamlit as st
+from datetime import date
+import database as db
+
+
+def _describe(alert: dict) -> str:
+    """One-line description of a threshold crossing."""
+    name = alert.get("categories", {}).get("name", "A category") if alert.get("categories") else "A category"
+    threshold = float(alert["threshold"])
+    amounts = f"{float(alert['total']):,.0f}₫ / {float(alert['budget']):,.0f}₫"
+    if alert["direction"] == "down":
+        return f"🟢 {name} is back under {threshold:.0%} ({amounts})"
+    if threshold >= 1:
+        return f"🔴 {name} is over budget ({amounts})"
+    return f"🟡 {name} passed {threshold:.0%} of budget ({amounts})"
+
+
+def render_budget_alerts(client, user, household_id, profile):
+    """Render budget alerts this user hasn't dismissed, from any household member's writes."""
+    since = max(profile.get("alerts_seen_at") or "", date.today().replace(day=1).isoformat())
+    alerts = db.load_budget_alerts(client, household_id, since)
+    if not alerts:
+        return
+
+    for alert in alerts:
+        st.caption(_describe(alert))
+    if st.button("Dismiss alerts", key="dismiss_budget_alerts", use_container_width=True):
+        newest = alerts[0]["created_at"]
+        db.mark_alerts_seen(client, user.id, newest)
+        st.session_state["profile"] = dict(profile, alerts_seen_at=newest)
+        db.load_budget_alerts.clear()
+        st.rerun()
@@ -1,13 +1,22 @@
 import streamlit as st
 from datetime import date
-import database as db
 
+# Same crossings, and the same >= comparison, as apply_budget_delta in schema.sql
+WARN_THRESHOLD = 0.8
+
+
+def render_budget(client, household_id, categories_data):
+    """Render the budget burn-down view.
+
+    Spending and the fixed/variable split come from the session's month
+    cache, which writes invalidate, so reruns don't query for them again.
+    """
+    from prefetch import get_prefetcher
 
-def render_budget(client, categories_data):
-    """Render the budget burn-down view."""
     st.subheader("Monthly Budget")
     today = date.today()
-    monthly_spending = db.get_monthly_spending(client, today.year, today.month)
+    prefetcher = get_prefetcher(client, household_id)
+    monthly_spending = prefetcher.get_spending(today.year, today.month)
 
     if categories_data:
         # Calculate totals
@@ -25,6 +34,10 @@ def render_budget(client, categories_data):
             delta_color = "normal" if total_remaining >= 0 else "inverse"
             st.metric("Remaining", f"{total_remaining:,.0f}₫", delta=f"{total_remaining:,.0f}₫", delta_color=delta_color)
 
+        # Fixed costs (bills, rent, tuition) vs discretionary spending
+        fixed_spent, variable_spent = prefetcher.get_fixed_variable(today.year, today.month)
+        st.caption(f"Fixed {fixed_spent:,.0f}₫ · Variable {variable_spent:,.0f}₫")
+
         # Category breakdown
         for cat in categories_data:
             budget = float(cat.get("monthly_budget") or 0)
@@ -32,7 +45,7 @@ def render_budget(client, categories_data):
 
             if budget > 0:
                 progress = min(spent / budget, 1.0)
-                status = "🔴" if spent > budget else "🟡" if progress > 0.8 else "🟢"
+                status = "🔴" if spent >= budget else "🟡" if spent >= WARN_THRESHOLD * budget else "🟢"
             else:
                 progress = 0
                 status = "⚪"
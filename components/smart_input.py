@@ -1,13 +1,24 @@
+import json
 import streamlit as st
-from datetime import date
-from nlp_parser import parse_expense
+from datetime import date, datetime
 import database as db
+from trends import invalidate_closed_totals
+from entry_queue import get_entry_queue, PENDING, FAILED, SAVED
 
+STATUS_ICONS = {PENDING: "⏳", FAILED: "❌", SAVED: "✅"}
+
+
+@st.fragment
+def render_smart_input(client, user, household_id, categories, category_names):
+    """Render the smart input form; entries are queued locally and saved in the background.
+
+    Runs as a fragment: submitting an entry reruns only this section, and the
+    queue below it reruns on its own while entries are in flight.
+    """
+    queue = get_entry_queue(client)
 
-def render_smart_input(client, user, model, categories, category_names):
-    """Render the smart input form and handle parsing."""
     st.subheader("What did you spend?")
-    with st.form("expense_form"):
+    with st.form("expense_form", clear_on_submit=True):
         expense_input = st.text_input(
             "Type naturally",
             placeholder="coffee 50k, lunch with Annie 200k, groceries 1.5M yesterday"
@@ -15,19 +26,82 @@ def render_smart_input(client, user, model, categories, category_names):
         submitted = st.form_submit_button("Go", use_container_width=True)
 
     if submitted and expense_input:
-        with st.spinner("Parsing..."):
-            parsed = parse_expense(expense_input, model, category_names)
-        if "error" not in parsed:
-            st.session_state["parsed_expense"] = parsed
-        else:
-            st.error(parsed["error"])
+        queue.enqueue(household_id, user.id, expense_input, categories)
+
+    # Poll for status changes only while something is still in flight
+    entries = queue.get_entries(user.id)
+    run_every = 2 if any(e["status"] == PENDING for e in entries) else None
+    st.fragment(run_every=run_every)(_render_queue)(client, user, household_id, queue, categories, category_names)
+
+
+def _render_queue(client, user, household_id, queue, categories, category_names):
+    """Queue status and review form; reruns alone on polls, retries and edits."""
+    entries = queue.get_entries(user.id)
+
+    # The budget depends on saved transactions: refresh the page once when the
+    # background worker saves something new
+    saved = {e["id"] for e in entries if e["status"] == SAVED}
+    seen = st.session_state.setdefault("queue_saved_ids", set(saved))
+    if saved - seen:
+        from prefetch import get_prefetcher
+
+        st.session_state["queue_saved_ids"] = saved
+        invalidate_closed_totals(*(json.loads(e["parsed"]).get("date") for e in entries
+                                   if e["id"] in saved - seen and e["parsed"]))
+        get_prefetcher(client, household_id).invalidate()
+        db.load_budget_alerts.clear()
+        st.rerun(scope="app")
+
+    _render_queue_status(queue, entries)
+    _handle_expense_form(client, user, household_id, queue, categories, category_names)
+
+
+def _render_queue_status(queue, entries):
+    """Render recent queued entries with pending, failed and saved states."""
+    if not entries:
+        return
 
-    # Handle expense form
-    _handle_expense_form(client, user, categories, category_names)
+    for entry in entries:
+        queued_at = datetime.fromtimestamp(entry["created_at"]).strftime("%H:%M")
+        col_text, col_actions = st.columns([3, 2])
+        with col_text:
+            st.write(f"{STATUS_ICONS[entry['status']]} {entry['raw_input']}")
+            if entry["status"] == FAILED:
+                st.caption(f"{queued_at} · {entry['error']}")
+            elif entry["status"] == PENDING and entry["error"]:
+                st.caption(f"{queued_at} · Retrying (attempt {entry['attempts'] + 1})")
+            else:
+                st.caption(queued_at)
+        with col_actions:
+            if entry["status"] == FAILED:
+                col_retry, col_edit, col_dismiss = st.columns(3, gap="small")
+                with col_retry:
+                    if st.button("Retry", key=f"retry_{entry['id']}", use_container_width=True):
+                        queue.retry(entry["id"])
+                        st.rerun(scope="fragment")
+                with col_edit:
+                    if st.button("Edit", key=f"edit_entry_{entry['id']}", use_container_width=True):
+                        st.session_state["parsed_expense"] = {
+                            "description": entry["raw_input"],
+                            "amount": 0.0,
+                            "category": "Other",
+                            "date": None,
+                            "is_annie_related": False,
+                            "queue_entry_id": entry["id"],
+                        }
+                        st.rerun(scope="fragment")
+                with col_dismiss:
+                    if st.button("✕", key=f"dismiss_{entry['id']}", use_container_width=True):
+                        queue.dismiss(entry["id"])
+                        st.rerun(scope="fragment")
+            elif entry["status"] == SAVED:
+                if st.button("✕", key=f"dismiss_{entry['id']}", use_container_width=True):
+                    queue.dismiss(entry["id"])
+                    st.rerun(scope="fragment")
 
 
-def _handle_expense_form(client, user, categories, category_names):
-    """Handle parsed expense review and save."""
+def _handle_expense_form(client, user, household_id, queue, categories, category_names):
+    """Handle manual review and save of an entry the queue could not parse."""
     if "parsed_expense" not in st.session_state:
         return
 
@@ -58,15 +132,21 @@ def _handle_expense_form(client, user, categories, category_names):
         category_id = categories.get(category) if categories else None
         try:
             db.add_transaction(
-                client, user.id, amount, description,
+                client, household_id, user.id, amount, description,
                 category_id, tx_date.isoformat(), is_annie
             )
             st.success(f"Saved: {description} - {amount:,.0f}₫")
+            if parsed.get("queue_entry_id"):
+                queue.dismiss(parsed["queue_entry_id"])
             del st.session_state["parsed_expense"]
-            st.rerun()
+            invalidate_closed_totals(tx_date.isoformat())
+            from prefetch import get_prefetcher
+            get_prefetcher(client, household_id).invalidate()
+            db.load_budget_alerts.clear()
+            st.rerun(scope="app")
         except Exception as e:
             st.error(f"Failed to save: {e}")
 
     if cancel_clicked:
         del st.session_state["parsed_expense"]
-        st.rerun()
+        st.rerun(scope="fragment")
@@ -0,0 +1,111 @@
+import streamlit as st
+from datetime import date
+import database as db
+import search
+
+
+def render_transaction_list(client, household_id, transactions, categories, category_names, prefetcher):
+    """Render a month's transactions as cards, each rerunning on its own."""
+    for tx in transactions.rows():
+        _render_transaction(client, household_id, tx, categories, category_names, prefetcher)
+
+
+def _after_write(prefetcher):
+    """Totals and other rows depend on the data: refresh the whole page."""
+    st.cache_data.clear()
+    prefetcher.invalidate()
+    st.rerun(scope="app")
+
+
+@st.fragment
+def _render_transaction(client, household_id, tx, categories, category_names, prefetcher):
+    """One transaction card with its edit and delete controls."""
+    cat_name = tx.get("categories", {}).get("name", "") if tx.get("categories") else ""
+    user_name = tx.get("profiles", {}).get("display_name", "") if tx.get("profiles") else ""
+    annie_tag = " 👶" if tx.get("is_annie_related") else ""
+    tx_date = tx["date"][5:] if tx.get("date") else ""
+
+    with st.container():
+        # Amount and description on same line
+        st.markdown(f"**{tx['amount']:,.0f}₫** · **{tx['description']}{annie_tag}**")
+        meta_parts = [tx_date]
+        if cat_name:
+            meta_parts.append(cat_name)
+        if user_name:
+            meta_parts.append(user_name)
+        st.caption(" · ".join(meta_parts))
+
+        editing = st.session_state.setdefault("editing_transactions", set())
+        if tx.get("archived"):
+            st.caption("Archived · restore the year in Manage Categories to edit")
+        elif tx["id"] in editing:
+            _render_edit_form(client, household_id, tx, categories, category_names, prefetcher)
+        elif st.session_state.get("confirm_delete_transaction") == tx["id"]:
+            st.warning("Delete this transaction?")
+            col1, col2 = st.columns(2, gap="small")
+            with col1:
+                if st.button("Confirm", key=f"confirm_{tx['id']}", type="primary", use_container_width=True):
+                    try:
+                        db.delete_transaction(client, household_id, tx["id"])
+                        search.transaction_deleted(client, household_id, tx["id"])
+                        del st.session_state["confirm_delete_transaction"]
+                        _after_write(prefetcher)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+            with col2:
+                if st.button("Cancel", key=f"cancel_{tx['id']}", use_container_width=True):
+                    del st.session_state["confirm_delete_transaction"]
+                    st.rerun(scope="fragment")
+        else:
+            # Action buttons side by side
+            col1, col2 = st.columns(2, gap="small")
+            with col1:
+                if st.button("Edit", key=f"edit_{tx['id']}", use_container_width=True):
+                    editing.add(tx["id"])
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button("Delete", key=f"delete_{tx['id']}", use_container_width=True):
+                    st.session_state["confirm_delete_transaction"] = tx["id"]
+                    st.rerun(scope="fragment")
+
+        st.divider()
+
+
+def _render_edit_form(client, household_id, tx, categories, category_names, prefetcher):
+    """Inline edit form (stacked vertically for mobile)."""
+    with st.form(f"edit_tx_form_{tx['id']}"):
+        edit_description = st.text_input("Description", value=tx.get("description") or "")
+        edit_amount = st.number_input("Amount (₫)", value=float(tx["amount"]), min_value=0.0, step=1000.0)
+
+        current_cat = tx.get("categories", {}).get("name") if tx.get("categories") else None
+        cat_index = category_names.index(current_cat) if current_cat in category_names else 0
+        edit_category = st.selectbox("Category", options=category_names, index=cat_index)
+
+        edit_date = st.date_input("Date", value=date.fromisoformat(tx["date"]) if tx.get("date") else date.today())
+        edit_annie = st.checkbox("Annie-related", value=tx.get("is_annie_related", False))
+
+        col_save, col_cancel = st.columns(2)
+        with col_save:
+            save_edit = st.form_submit_button("Save", type="primary", use_container_width=True)
+        with col_cancel:
+            cancel_edit = st.form_submit_button("Cancel", use_container_width=True)
+
+    if save_edit:
+        category_id = categories.get(edit_category) if categories else None
+        try:
+            db.update_transaction(
+                client, household_id, tx["id"], edit_amount, edit_description,
+                category_id, edit_date.isoformat(), edit_annie
+            )
+            search.transaction_updated(
+                client, household_id, tx["id"], amount=edit_amount, description=edit_description,
+                date=edit_date.isoformat(), is_annie_related=edit_annie, category_name=edit_category
+            )
+            st.session_state["editing_transactions"].discard(tx["id"])
+            _after_write(prefetcher)
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+    if cancel_edit:
+        st.session_state["editing_transactions"].discard(tx["id"])
+        st.rerun(scope="fragment")
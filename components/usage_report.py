@@ -0,0 +1,51 @@
+import streamlit as st
+from datetime import date
+import database as db
+from gemini_client import get_rate_limiter, get_parse_flight
+
+
+def render_usage_report(client, household_id):
+    """Render AI parse usage for the current month: tokens, latency and cost per entry."""
+    since = date.today().replace(day=1).isoformat()
+    rows = db.get_llm_usage(client, household_id, since)
+
+    if not rows:
+        st.caption("No AI usage recorded this month.")
+        _render_limiter_stats()
+        return
+
+    calls = len(rows)
+    failed = sum(1 for r in rows if not r.get("succeeded"))
+    prompt_tokens = sum(r.get("prompt_tokens") or 0 for r in rows)
+    output_tokens = sum(r.get("output_tokens") or 0 for r in rows)
+    total_cost = sum(float(r.get("cost_usd") or 0) for r in rows)
+    latencies = sorted(float(r["latency_ms"]) for r in rows if r.get("latency_ms") is not None)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Calls", f"{calls}", delta=f"{failed} failed" if failed else None, delta_color="inverse")
+    with col2:
+        st.metric("Tokens / entry", f"{(prompt_tokens + output_tokens) / calls:,.0f}")
+    with col3:
+        st.metric("Cost / entry", f"${total_cost / calls:.6f}")
+
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        st.caption(f"Latency p50 {p50:,.0f} ms · p95 {p95:,.0f} ms")
+    st.caption(
+        f"{prompt_tokens:,} prompt + {output_tokens:,} output tokens · ${total_cost:.4f} this month"
+    )
+    _render_limiter_stats()
+
+
+def _render_limiter_stats():
+    """Render process-wide rate limiter and request coalescing counters."""
+    limiter = get_rate_limiter().stats
+    flight = get_parse_flight().stats
+    avg_wait = limiter["total_wait_ms"] / limiter["acquired"] if limiter["acquired"] else 0
+    st.caption(
+        f"Since restart: {limiter['acquired']} calls · {limiter['waited']} queued "
+        f"(avg {avg_wait:,.0f} ms, max {limiter['max_wait_ms']:,.0f} ms) · "
+        f"{limiter['rejected']} rejected · {flight['coalesced']} coalesced"
+    )
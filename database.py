@@ -1,9 +1,14 @@
 import streamlit as st
-from st_supabase_connection import SupabaseConnection
 
 
 def get_connection():
-    """Get Supabase connection."""
+    """Get the shared Supabase connection.
+
+    Its key is the service-role key: tenancy is enforced by the household_id
+    filters in this module, not by row-level security (see schema.sql, section 9).
+    """
+    from st_supabase_connection import SupabaseConnection
+
     return st.connection(
         "supabase",
         type=SupabaseConnection,
@@ -12,10 +17,31 @@ def get_connection():
     )
 
 
-@st.cache_data(ttl=300)
-def load_categories(_client):
-    """Load all categories with budget info, sorted by budget descending."""
-    result = _client.from_("categories").select("id, name, monthly_budget").order("monthly_budget", desc=True).execute()
+def get_auth_client():
+    """Get a fresh Supabase client for password sign-in and sign-up.
+
+    Signing in stores the user's JWT on the client it runs on, so it must not
+    touch the shared connection that every session and background job uses.
+    """
+    from supabase import create_client
+
+    return create_client(
+        st.secrets["connections"]["supabase"]["url"],
+        st.secrets["connections"]["supabase"]["key"],
+    )
+
+
+# Reference data changes only through this app, whose write paths clear the
+# cache, so it can outlive the gap between the scheduler's daily warm-ups
+REFERENCE_TTL = 86400
+
+
+@st.cache_data(ttl=REFERENCE_TTL)
+def load_categories(_client, household_id: str):
+    """Load a household's categories with budget info, sorted by budget descending."""
+    result = _client.from_("categories").select(
+        "id, name, monthly_budget, is_fixed"
+    ).eq("household_id", household_id).order("monthly_budget", desc=True).execute()
     return result.data
 
 
@@ -34,89 +60,181 @@ def get_category_names(categories_data):
     return list(get_category_map(categories_data).keys())
 
 
-def get_monthly_spending(client, year: int, month: int):
-    """Get spending totals by category for a given month (all users)."""
+def get_monthly_spending(client, household_id: str, year: int, month: int):
+    """Get spending totals by category for a given month (all household members)."""
     start_date = f"{year}-{month:02d}-01"
     if month == 12:
         end_date = f"{year + 1}-01-01"
     else:
         end_date = f"{year}-{month + 1:02d}-01"
 
+    from ledger import MonthLedger
+
     result = client.from_("transactions").select(
         "category_id, amount"
-    ).gte("date", start_date).lt("date", end_date).execute()
+    ).eq("household_id", household_id).gte("date", start_date).lt("date", end_date).execute()
+    rows = result.data
 
-    spending = {}
-    for tx in result.data:
-        cat_id = tx.get("category_id")
-        if cat_id:
-            spending[cat_id] = spending.get(cat_id, 0) + float(tx["amount"])
-    return spending
+    # Archived months keep their totals in transaction_summaries
+    if start_date in load_archived_months(client, household_id):
+        summaries = client.from_("transaction_summaries").select(
+            "category_id, total"
+        ).eq("household_id", household_id).eq("month", start_date).execute()
+        rows = rows + [{"category_id": s["category_id"], "amount": s["total"]} for s in summaries.data]
 
+    return MonthLedger.from_transactions(rows).spending_by_category()
+
+
+def get_monthly_totals(client, household_id: str, start_date: str, end_date: str):
+    """Get totals grouped by month, category, user and Annie flag (one server-side query)."""
+    result = client.rpc("monthly_totals", {
+        "p_household_id": household_id,
+        "start_date": start_date,
+        "end_date": end_date
+    }).execute()
+    return result.data or []
 
-def add_category(client, name: str, budget: float):
+
+def get_fixed_variable_spending(client, household_id: str, year: int, month: int):
+    """Get (fixed, variable) spending totals for a month, split by categories.is_fixed."""
+    start_date = f"{year}-{month:02d}-01"
+    if month == 12:
+        end_date = f"{year + 1}-01-01"
+    else:
+        end_date = f"{year}-{month + 1:02d}-01"
+
+    result = client.rpc("fixed_variable_spending", {
+        "p_household_id": household_id,
+        "start_date": start_date,
+        "end_date": end_date
+    }).execute()
+    totals = result.data or {}
+    return float(totals.get("fixed") or 0), float(totals.get("variable") or 0)
+
+
+def add_category(client, household_id: str, name: str, budget: float, is_fixed: bool = False):
     """Add a new category."""
     client.from_("categories").insert({
+        "household_id": household_id,
         "name": name,
-        "monthly_budget": budget
+        "monthly_budget": budget,
+        "is_fixed": is_fixed
     }).execute()
 
 
-def update_category(client, category_id: str, budget: float):
-    """Update category budget."""
-    client.from_("categories").update({
-        "monthly_budget": budget
-    }).eq("id", category_id).execute()
+def update_category(client, household_id: str, category_id: str, budget: float, is_fixed: bool = None):
+    """Update category budget (and fixed-cost flag if given)."""
+    update_data = {"monthly_budget": budget}
+    if is_fixed is not None:
+        update_data["is_fixed"] = is_fixed
+    client.from_("categories").update(update_data).eq("household_id", household_id).eq("id", category_id).execute()
 
 
-def update_category_by_name(client, name: str, budget: float):
+def update_category_by_name(client, household_id: str, name: str, budget: float):
     """Update category budget by name."""
     client.from_("categories").update({
         "monthly_budget": budget
-    }).eq("name", name).execute()
+    }).eq("household_id", household_id).eq("name", name).execute()
 
 
-def delete_category(client, category_id: str):
+def delete_category(client, household_id: str, category_id: str):
     """Delete a category (unlinks transactions first)."""
     client.from_("transactions").update({
         "category_id": None
-    }).eq("category_id", category_id).execute()
-    client.from_("categories").delete().eq("id", category_id).execute()
+    }).eq("household_id", household_id).eq("category_id", category_id).execute()
+    client.from_("categories").delete().eq("household_id", household_id).eq("id", category_id).execute()
 
 
-def delete_category_by_name(client, name: str):
+def delete_category_by_name(client, household_id: str, name: str):
     """Delete a category by name."""
-    result = client.from_("categories").select("id").eq("name", name).execute()
+    result = client.from_("categories").select("id").eq("household_id", household_id).eq("name", name).execute()
     if result.data:
-        delete_category(client, result.data[0]["id"])
+        delete_category(client, household_id, result.data[0]["id"])
         return True
     return False
 
 
-def get_recent_transactions(client, user_id: str, limit: int = 10):
+def get_recent_transactions(client, household_id: str, user_id: str, limit: int = 10):
     """Get recent transactions for a user."""
     return client.from_("transactions").select(
         "*, categories(name)"
-    ).eq("user_id", user_id).order("date", desc=True).limit(limit).execute()
+    ).eq("household_id", household_id).eq("user_id", user_id).order("date", desc=True).limit(limit).execute()
 
 
-def get_monthly_transactions(client, year: int, month: int):
-    """Get all transactions for a specific month (all users)."""
+def get_monthly_transactions(client, household_id: str, year: int, month: int):
+    """Get all transactions for a specific month (all household members)."""
     start_date = f"{year}-{month:02d}-01"
     if month == 12:
         end_date = f"{year + 1}-01-01"
     else:
         end_date = f"{year}-{month + 1:02d}-01"
 
-    return client.from_("transactions").select(
+    result = client.from_("transactions").select(
         "*, categories(name), profiles(display_name)"
-    ).gte("date", start_date).lt("date", end_date).order("date", desc=True).execute()
+    ).eq("household_id", household_id).gte("date", start_date).lt("date", end_date).order("date", desc=True).execute()
+
+    # Read archived detail through on demand
+    if start_date in load_archived_months(client, household_id):
+        result.data.extend(get_archived_transactions(client, household_id, start_date, end_date))
+        result.data.sort(key=lambda tx: tx.get("date") or "", reverse=True)
+    return result
+
+
+def search_transactions(client, household_id: str, query: str, limit: int = 20, offset: int = 0):
+    """Search descriptions across all years (ranked, paginated, typo tolerant)."""
+    result = client.rpc("search_transactions", {
+        "p_household_id": household_id,
+        "query": query,
+        "page_size": limit,
+        "page_offset": offset
+    }).execute()
+    return result.data
+
+
+def get_transactions_since(client, household_id: str, since: tuple = None, limit: int = 1000):
+    """Get up to limit transactions after a (created_at, id) watermark (from the start if None), oldest first.
+
+    The id tie-break keeps rows that share created_at (bulk inserts) from being
+    skipped at a page boundary.
+    """
+    query = client.from_("transactions").select(
+        "id, date, amount, description, is_annie_related, created_at, categories(name), profiles(display_name)"
+    ).eq("household_id", household_id)
+    if since:
+        created_at, tx_id = since
+        query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{tx_id})')
+    return query.order("created_at").order("id").range(0, limit - 1).execute().data
+
+
+def get_transactions_page(client, household_id: str, since: str, offset: int, limit: int):
+    """Raw transaction rows added or edited after a watermark (all if None), oldest first, one page at a time."""
+    query = client.from_("transactions").select(
+        "id, user_id, category_id, amount, description, is_annie_related, date, created_at, updated_at"
+    ).eq("household_id", household_id)
+    if since:
+        query = query.gt("updated_at", since)
+    return query.order("updated_at").order("id").range(offset, offset + limit - 1).execute().data
+
+
+def get_transaction_deletes_page(client, household_id: str, since: str, offset: int, limit: int):
+    """Transactions deleted or archived after a watermark, oldest first, one page at a time."""
+    return client.from_("transaction_deletes").select(
+        "id, archived, deleted_at"
+    ).eq("household_id", household_id).gt("deleted_at", since).order("deleted_at").order("id").range(
+        offset, offset + limit - 1
+    ).execute().data
+
 
+def purge_transaction_deletes(client, before: str):
+    """Drop deletes-log entries older than a cutoff, across all households."""
+    client.from_("transaction_deletes").delete().lt("deleted_at", before).execute()
 
-def add_transaction(client, user_id: str, amount: float, description: str,
+
+def add_transaction(client, household_id: str, user_id: str, amount: float, description: str,
                     category_id: str, tx_date: str, is_annie_related: bool):
     """Add a new transaction."""
     transaction = {
+        "household_id": household_id,
         "user_id": user_id,
         "amount": amount,
         "description": description,
@@ -128,7 +246,15 @@ def add_transaction(client, user_id: str, amount: float, description: str,
     client.from_("transactions").insert(transaction).execute()
 
 
-def update_transaction(client, tx_id: str, amount: float, description: str,
+def add_transactions(client, household_id: str, transactions: list):
+    """Insert several transactions in a single request."""
+    if transactions:
+        client.from_("transactions").insert(
+            [dict(tx, household_id=household_id) for tx in transactions]
+        ).execute()
+
+
+def update_transaction(client, household_id: str, tx_id: str, amount: float, description: str,
                        category_id: str, tx_date: str, is_annie_related: bool):
     """Update an existing transaction."""
     update_data = {
@@ -138,12 +264,106 @@ def update_transaction(client, tx_id: str, amount: float, description: str,
         "date": tx_date,
         "category_id": category_id
     }
-    client.from_("transactions").update(update_data).eq("id", tx_id).execute()
+    client.from_("transactions").update(update_data).eq("household_id", household_id).eq("id", tx_id).execute()
 
 
-def delete_transaction(client, tx_id: str):
+def delete_transaction(client, household_id: str, tx_id: str):
     """Delete a transaction."""
-    client.from_("transactions").delete().eq("id", tx_id).execute()
+    client.from_("transactions").delete().eq("household_id", household_id).eq("id", tx_id).execute()
+
+
+# Recurring transaction functions
+def get_recurring_transactions(client, household_id: str, active_only: bool = False):
+    """Get a household's recurring transaction templates."""
+    query = client.from_("recurring_transactions").select(
+        "*, categories(name)"
+    ).eq("household_id", household_id)
+    if active_only:
+        query = query.eq("active", True)
+    return query.order("description").execute().data
+
+
+def add_recurring_transaction(client, household_id: str, user_id: str, amount: float, description: str,
+                              category_id: str, is_annie_related: bool, schedule: str,
+                              start_date: str, end_date: str = None):
+    """Add a recurring transaction template."""
+    template = {
+        "household_id": household_id,
+        "user_id": user_id,
+        "amount": amount,
+        "description": description,
+        "category_id": category_id,
+        "is_annie_related": is_annie_related,
+        "schedule": schedule,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    client.from_("recurring_transactions").insert(template).execute()
+
+
+def set_recurring_active(client, household_id: str, recurring_id: str, active: bool,
+                         generated_through: str = None):
+    """Pause or resume a recurring transaction template.
+
+    Resuming with generated_through moves last_generated_date forward so the
+    paused period is skipped rather than filled in; use backfill for that.
+    """
+    update = {"active": active}
+    if generated_through:
+        update["last_generated_date"] = generated_through
+    client.from_("recurring_transactions").update(update).eq("household_id", household_id).eq("id", recurring_id).execute()
+
+
+def delete_recurring_transaction(client, household_id: str, recurring_id: str):
+    """Delete a recurring transaction template (generated transactions are kept)."""
+    client.from_("recurring_transactions").delete().eq("household_id", household_id).eq("id", recurring_id).execute()
+
+
+def set_recurring_generated(client, household_id: str, recurring_id: str, generated_through: str):
+    """Record the last date a template has been materialized through."""
+    client.from_("recurring_transactions").update({
+        "last_generated_date": generated_through
+    }).eq("household_id", household_id).eq("id", recurring_id).execute()
+
+
+def add_recurring_occurrences(client, household_id: str, transactions: list):
+    """Bulk insert generated occurrences, skipping (recurring_id, date) pairs that exist.
+
+    Returns the number of rows inserted.
+    """
+    if not transactions:
+        return 0
+    result = client.from_("transactions").upsert(
+        [dict(tx, household_id=household_id) for tx in transactions],
+        on_conflict="recurring_id,date",
+        ignore_duplicates=True
+    ).execute()
+    return len(result.data or [])
+
+
+# Household functions
+def create_household(client, name: str):
+    """Create a new household. Returns its id."""
+    result = client.from_("households").insert({"name": name}).execute()
+    return result.data[0]["id"] if result.data else None
+
+
+def get_household(client, household_id: str):
+    """Get a household by id."""
+    result = client.from_("households").select("id, name, invite_code").eq("id", household_id).execute()
+    return result.data[0] if result.data else None
+
+
+def get_household_by_invite_code(client, invite_code: str):
+    """Get the household a family member's invite code belongs to."""
+    result = client.from_("households").select("id, name").eq("invite_code", invite_code).execute()
+    return result.data[0] if result.data else None
+
+
+def get_household_ids(client):
+    """Get the ids of all households (for background maintenance)."""
+    result = client.from_("households").select("id").execute()
+    return [row["id"] for row in result.data]
 
 
 # Profile functions
@@ -153,11 +373,12 @@ def get_profile(client, user_id: str):
     return result.data[0] if result.data else None
 
 
-def create_profile(client, user_id: str, display_name: str):
-    """Create a new user profile."""
+def create_profile(client, user_id: str, display_name: str, household_id: str):
+    """Create a new user profile in a household."""
     client.from_("profiles").insert({
         "id": user_id,
-        "display_name": display_name
+        "display_name": display_name,
+        "household_id": household_id
     }).execute()
 
 
@@ -168,12 +389,94 @@ def update_profile(client, user_id: str, display_name: str):
     }).eq("id", user_id).execute()
 
 
-def get_all_profiles(client):
-    """Get all user profiles."""
-    result = client.from_("profiles").select("id, display_name").order("display_name").execute()
+def get_all_profiles(client, household_id: str):
+    """Get all profiles in a household."""
+    result = client.from_("profiles").select(
+        "id, display_name"
+    ).eq("household_id", household_id).order("display_name").execute()
     return result.data
 
 
+# LLM usage functions
+def record_llm_usage(client, household_id: str, user_id: str, usage: dict, succeeded: bool):
+    """Record token counts, latency and cost of one parse call."""
+    client.from_("llm_usage").insert({
+        "household_id": household_id,
+        "user_id": user_id,
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "latency_ms": usage.get("latency_ms"),
+        "cost_usd": usage.get("cost_usd", 0),
+        "succeeded": succeeded
+    }).execute()
+
+
+def get_llm_usage(client, household_id: str, since: str):
+    """Get parse call usage rows recorded on or after a date."""
+    result = client.from_("llm_usage").select(
+        "prompt_tokens, output_tokens, latency_ms, cost_usd, succeeded"
+    ).eq("household_id", household_id).gte("created_at", since).execute()
+    return result.data
+
+
+# Archive functions (closed years moved out of the hot table, see schema.sql)
+@st.cache_data(ttl=REFERENCE_TTL)
+def load_archived_months(_client, household_id: str):
+    """First days (ISO) of a household's archived months."""
+    result = _client.from_("transactions_archive").select("month").eq("household_id", household_id).execute()
+    return {row["month"] for row in result.data}
+
+
+def get_archived_transactions(client, household_id: str, start_date: str, end_date: str):
+    """Archived transactions in [start_date, end_date), shaped like get_monthly_transactions rows."""
+    result = client.rpc("archived_transactions", {
+        "p_household_id": household_id,
+        "start_date": start_date,
+        "end_date": end_date
+    }).execute()
+    return result.data or []
+
+
+def get_oldest_transaction_date(client, household_id: str):
+    """Date of a household's oldest transaction in the hot table, or None."""
+    result = client.from_("transactions").select("date").eq(
+        "household_id", household_id
+    ).order("date").limit(1).execute()
+    return result.data[0]["date"] if result.data else None
+
+
+def archive_year(client, household_id: str, year: int):
+    """Move a closed year into the archive. Returns {"year", "rows", "total"}."""
+    return client.rpc("archive_year", {"p_household_id": household_id, "p_year": year}).execute().data
+
+
+def restore_year(client, household_id: str, year: int):
+    """Move an archived year back into transactions. Returns {"year", "rows"}."""
+    return client.rpc("restore_year", {"p_household_id": household_id, "p_year": year}).execute().data
+
+
+def verify_archive(client, household_id: str, year: int):
+    """Check an archived year's counts and totals. Returns {"ok", "mismatches", ...}."""
+    return client.rpc("verify_archive", {"p_household_id": household_id, "p_year": year}).execute().data
+
+
+# Budget alert functions (alerts are recorded by a trigger on transaction writes)
+@st.cache_data(ttl=30)
+def load_budget_alerts(_client, household_id: str, since: str, limit: int = 10):
+    """Load a household's budget threshold crossings recorded after since, newest first."""
+    result = _client.from_("budget_alerts").select(
+        "id, month, threshold, direction, total, budget, created_at, categories(name)"
+    ).eq("household_id", household_id).gt("created_at", since).order("created_at", desc=True).limit(limit).execute()
+    return result.data
+
+
+def mark_alerts_seen(client, user_id: str, seen_at: str):
+    """Record that a user has seen alerts up to seen_at."""
+    client.from_("profiles").update({
+        "alerts_seen_at": seen_at
+    }).eq("id", user_id).execute()
+
+
 # Session functions
 def create_session(client, user_id: str, email: str):
     """Create a new session token for a user."""
@@ -224,6 +527,19 @@ def delete_session(client, token: str):
     client.from_("sessions").delete().eq("token", token).execute()
 
 
-def cleanup_expired_sessions(client):
-    """Delete all expired sessions."""
-    client.from_("sessions").delete().lt("expires_at", "now()").execute()
+def cleanup_expired_sessions(client, batch_size: int = 500):
+    """Delete expired sessions in batches. Returns the number deleted."""
+    from datetime import datetime, timezone
+
+    now = datetime.now(timezone.utc).isoformat()
+    deleted = 0
+    while True:
+        result = client.from_("sessions").select("token").lt("expires_at", now).limit(batch_size).execute()
+        tokens = [row["token"] for row in result.data]
+        if not tokens:
+            return deleted
+        removed = client.from_("sessions").delete().in_("token", tokens).execute().data
+        if not removed:
+            # Nothing could be deleted (e.g. no permission); stop rather than reselect forever
+            return deleted
+        deleted += len(removed)
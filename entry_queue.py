@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import streamlit as st
+import database as db
+from nlp_parser import parse_input
+
+QUEUE_PATH = os.environ.get("ENTRY_QUEUE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".entry_queue.sqlite3"))
+
+BATCH_SIZE = 20
+# Parses in flight at once; identical inputs coalesce and the rate limiter queues the rest
+PARSE_WORKERS = 4
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 2
+POLL_SECONDS = 5
+
+PENDING = "pending"
+FAILED = "failed"
+SAVED = "saved"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  household_id TEXT,
+  user_id TEXT NOT NULL,
+  raw_input TEXT NOT NULL,
+  categories TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  parsed TEXT,
+  error TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at REAL NOT NULL DEFAULT 0,
+  created_at REAL NOT NULL,
+  updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_status_idx ON entries (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS entries_user_idx ON entries (user_id, created_at);
+"""
+
+
+def _rejected(error: Exception) -> bool:
+    """True when Postgres refused the data itself (data exception or constraint
+    violation), so retrying the same rows cannot succeed."""
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in ("22", "23")
+
+
+class EntryQueue:
+    """Durable local queue of raw smart-input entries.
+
+    Entries are written to SQLite immediately; a background worker parses each
+    batch with Gemini on a small thread pool and inserts the results into
+    Supabase in bulk, retrying with exponential backoff while either service
+    is unavailable.
+    """
+
+    def __init__(self, client, model=None, path: str = QUEUE_PATH):
+        self.client = client
+        self.model = model
+        self.path = path
+        self._wake = threading.Event()
+        self._parser = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="entry-queue-parse")
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(entries)")]
+            if "household_id" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN household_id TEXT")
+        self._worker = threading.Thread(target=self._run, name="entry-queue-worker", daemon=True)
+        self._worker.start()
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection that commits on success."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, household_id: str, user_id: str, raw_input: str, categories: dict) -> int:
+        """Store a raw entry and wake the worker. Returns the entry id."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO entries (household_id, user_id, raw_input, categories, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (household_id, user_id, raw_input, json.dumps(categories or {}), now, now)
+            )
+        self._wake.set()
+        return cursor.lastrowid
+
+    def retry(self, entry_id: int):
+        """Put a failed entry back in the queue."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE entries SET status = ?, attempts = 0, next_attempt_at = 0, error = NULL, updated_at = ? WHERE id = ?",
+                (PENDING, time.time(), entry_id)
+            )
+        self._wake.set()
+
+    def dismiss(self, entry_id: int):
+        """Remove an entry from the queue."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def get_entries(self, user_id: str, limit: int = 10):
+        """Get a user's most recent entries with their status."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, raw_input, status, parsed, error, attempts, created_at FROM entries "
+                "WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+                (user_id, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _run(self):
+        while True:
+            try:
+                processed = self._process_batch()
+            except Exception:
+                processed = 0
+            if not processed:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+
+    def _process_batch(self) -> int:
+        """Parse and insert up to BATCH_SIZE due entries. Returns number handled."""
+        now = time.time()
+        with self._connect() as conn:
+            rows = [dict(r) for r in conn.execute(
+                "SELECT * FROM entries WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, now, BATCH_SIZE)
+            ).fetchall()]
+        if not rows:
+            return 0
+
+        ready = [entry for entry in rows if entry["parsed"]]
+        unparsed = [entry for entry in rows if not entry["parsed"]]
+        for entry, parsed in zip(unparsed, self._parser.map(self._parse, unparsed)):
+            categories = json.loads(entry["categories"])
+            self._record_usage(entry["household_id"], entry["user_id"], parsed)
+
+            if "error" in parsed:
+                # Only rate limits, network errors and timeouts can succeed on retry
+                self._fail(entry, parsed["error"], parsed.get("retryable", False))
+            elif parsed.get("type") == "category":
+                self._fail(entry, "Category commands cannot be queued. Use Manage Categories.", False)
+            else:
+                parsed["category_id"] = categories.get(parsed["category"])
+                entry["parsed"] = json.dumps(parsed)
+                self._update(entry["id"], parsed=entry["parsed"])
+                ready.append(entry)
+
+        # One bulk insert per household in the batch
+        households = {}
+        for entry in ready:
+            households.setdefault(entry["household_id"], []).append(entry)
+
+        for household_id, entries in households.items():
+            transactions = [self._transaction(entry) for entry in entries]
+            try:
+                db.add_transactions(self.client, household_id, transactions)
+                for entry in entries:
+                    self._update(entry["id"], status=SAVED, error=None)
+            except Exception as e:
+                if _rejected(e):
+                    # One bad row rejects the whole insert; save the rest one by one
+                    self._save_each(household_id, entries, transactions)
+                else:
+                    for entry in entries:
+                        self._fail(entry, f"Failed to save: {e}", True)
+
+        return len(rows)
+
+    def _parse(self, entry: dict) -> dict:
+        categories = json.loads(entry["categories"])
+        return parse_input(entry["raw_input"], self.model, list(categories.keys()) or None)
+
+    def _transaction(self, entry: dict) -> dict:
+        parsed = json.loads(entry["parsed"])
+        transaction = {
+            "user_id": entry["user_id"],
+            "amount": parsed["amount"],
+            "description": parsed["description"],
+            "is_annie_related": parsed["is_annie_related"],
+            "date": parsed["date"] or time.strftime("%Y-%m-%d", time.localtime(entry["created_at"])),
+        }
+        if parsed.get("category_id"):
+            transaction["category_id"] = parsed["category_id"]
+        return transaction
+
+    def _save_each(self, household_id: str, entries: list, transactions: list):
+        """Insert rows individually so only the offending entries fail."""
+        for entry, transaction in zip(entries, transactions):
+            try:
+                db.add_transactions(self.client, household_id, [transaction])
+                self._update(entry["id"], status=SAVED, error=None)
+            except Exception as e:
+                self._fail(entry, f"Failed to save: {e}", not _rejected(e))
+
+    def _fail(self, entry: dict, error: str, transient: bool):
+        attempts = entry["attempts"] + 1
+        if transient and attempts < MAX_ATTEMPTS:
+            self._update(entry["id"], attempts=attempts, error=error,
+                         next_attempt_at=time.time() + RETRY_BASE_SECONDS * 2 ** attempts)
+        else:
+            self._update(entry["id"], status=FAILED, attempts=attempts, error=error)
+
+    def _update(self, entry_id: int, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE entries SET {assignments} WHERE id = ?", (*fields.values(), entry_id))
+
+    def _record_usage(self, household_id: str, user_id: str, parsed: dict):
+        if "usage" not in parsed:
+            return
+        try:
+            db.record_llm_usage(self.client, household_id, user_id, parsed["usage"], "error" not in parsed)
+        except Exception:
+            pass
+
+
+@st.cache_resource
+def get_entry_queue(_client):
+    """Get the process-wide entry queue (starts its worker on first use).
+
+    The Gemini model is created by the worker on its first parse.
+    """
+    return EntryQueue(_client)
@@ -1,15 +1,81 @@
-import google.generativeai as genai
 import streamlit as st
+from rate_limit import TokenBucket, SingleFlight
+
+MODEL_NAME = 'gemini-2.0-flash-lite'
+
+# Bump when build_response_schema changes shape, so cached or shared parses
+# made against the old schema are never handed out
+SCHEMA_VERSION = 1
+
+# Output is a single small JSON object, so keep the budget tight
+MAX_OUTPUT_TOKENS = 128
+
+# Default request quota when secrets don't set connections.gemini.requests_per_minute
+DEFAULT_REQUESTS_PER_MINUTE = 30
+
+# USD per 1M tokens for MODEL_NAME (paid tier)
+INPUT_PRICE_PER_M = 0.075
+OUTPUT_PRICE_PER_M = 0.30
+
+
+def build_response_schema(category_codes: list = None) -> dict:
+    """JSON schema covering both expenses and category commands.
+
+    When category codes are given the expense category is constrained to them.
+    """
+    category = {"type": "STRING", "nullable": True}
+    if category_codes:
+        category["enum"] = category_codes
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "type": {"type": "STRING", "enum": ["expense", "category"]},
+            "amount": {"type": "NUMBER", "nullable": True},
+            "description": {"type": "STRING", "nullable": True},
+            "category": category,
+            "is_annie_related": {"type": "BOOLEAN", "nullable": True},
+            "date": {"type": "STRING", "nullable": True},
+            "action": {"type": "STRING", "enum": ["add", "update", "remove"], "nullable": True},
+            "name": {"type": "STRING", "nullable": True},
+            "budget": {"type": "NUMBER", "nullable": True},
+        },
+        "required": ["type"],
+    }
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a single call."""
+    return (prompt_tokens * INPUT_PRICE_PER_M + output_tokens * OUTPUT_PRICE_PER_M) / 1_000_000
 
 
 @st.cache_resource
 def get_gemini_model():
-    """Initialize and return the Gemini model (cached)."""
+    """Initialize and return the Gemini model (cached).
+
+    The SDK is imported here so pages that never parse input don't pay for it.
+    """
+    import google.generativeai as genai
+
     genai.configure(api_key=st.secrets["connections"]["gemini"]["api_key"])
     return genai.GenerativeModel(
-        'gemini-2.0-flash-lite',
+        MODEL_NAME,
         generation_config={
-            "max_output_tokens": 256,
+            "max_output_tokens": MAX_OUTPUT_TOKENS,
             "temperature": 0.1,
+            "response_mime_type": "application/json",
+            "response_schema": build_response_schema(),
         }
     )
+
+
+@st.cache_resource
+def get_rate_limiter():
+    """Process-wide token bucket sized to the Gemini request quota."""
+    gemini_secrets = st.secrets["connections"]["gemini"]
+    return TokenBucket(gemini_secrets.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE))
+
+
+@st.cache_resource
+def get_parse_flight():
+    """Process-wide single-flight group for identical in-flight parse requests."""
+    return SingleFlight()
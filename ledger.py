@@ -0,0 +1,147 @@
+from datetime import date
+import numpy as np
+
+# Amounts are NUMERIC(15,2); store them as integer hundredths
+MINOR_UNITS = 100
+
+
+def _encode(value, dictionary: dict) -> int:
+    """Dictionary-encode a value, returning -1 for missing."""
+    if value is None:
+        return -1
+    if value not in dictionary:
+        dictionary[value] = len(dictionary)
+    return dictionary[value]
+
+
+class MonthLedger:
+    """Columnar view of a month's transactions.
+
+    Amounts are int64 minor units, categories and users are dictionary-encoded
+    int32 codes (-1 when missing), and dates are int32 ordinals, so filters,
+    totals and group-bys are vectorized instead of looping over nested dicts.
+    """
+
+    def __init__(self, ids, descriptions, amounts, dates, annie, category_codes, user_codes,
+                 category_ids, category_names, user_ids, user_names, archived=None):
+        self.ids = ids
+        self.descriptions = descriptions
+        self.amounts = amounts
+        self.dates = dates
+        self.annie = annie
+        self.category_codes = category_codes
+        self.user_codes = user_codes
+        self.category_ids = category_ids
+        self.category_names = category_names
+        self.user_ids = user_ids
+        self.user_names = user_names
+        # Rows read through from the archive are shown but not editable
+        self.archived = archived if archived is not None else np.zeros(len(amounts), dtype=bool)
+
+    @classmethod
+    def from_transactions(cls, rows):
+        """Build from Supabase rows (with optional categories/profiles joins)."""
+        categories = {}
+        users = {}
+        category_names = {}
+        user_names = {}
+        ids, descriptions, amounts, dates, annie, category_codes, user_codes = [], [], [], [], [], [], []
+        archived = []
+
+        for tx in rows or []:
+            category_id = tx.get("category_id")
+            user_id = tx.get("user_id")
+            category_codes.append(_encode(category_id, categories))
+            user_codes.append(_encode(user_id, users))
+            if category_id is not None and tx.get("categories"):
+                category_names[category_id] = tx["categories"].get("name")
+            if user_id is not None and tx.get("profiles"):
+                user_names[user_id] = tx["profiles"].get("display_name")
+
+            ids.append(tx.get("id"))
+            descriptions.append(tx.get("description"))
+            amounts.append(round(float(tx["amount"]) * MINOR_UNITS))
+            dates.append(date.fromisoformat(tx["date"]).toordinal() if tx.get("date") else 0)
+            annie.append(bool(tx.get("is_annie_related")))
+            archived.append(bool(tx.get("archived")))
+
+        category_ids = list(categories)
+        user_ids = list(users)
+        return cls(
+            ids=np.array(ids, dtype=object),
+            descriptions=np.array(descriptions, dtype=object),
+            amounts=np.array(amounts, dtype=np.int64),
+            dates=np.array(dates, dtype=np.int32),
+            annie=np.array(annie, dtype=bool),
+            category_codes=np.array(category_codes, dtype=np.int32),
+            user_codes=np.array(user_codes, dtype=np.int32),
+            category_ids=category_ids,
+            category_names=[category_names.get(c) for c in category_ids],
+            user_ids=user_ids,
+            user_names=[user_names.get(u) for u in user_ids],
+            archived=np.array(archived, dtype=bool),
+        )
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def mask_category(self, name: str):
+        """Boolean mask of rows in the named category."""
+        codes = [i for i, n in enumerate(self.category_names) if n == name]
+        return np.isin(self.category_codes, codes)
+
+    def mask_user(self, name: str):
+        """Boolean mask of rows entered by the named user."""
+        codes = [i for i, n in enumerate(self.user_names) if n == name]
+        return np.isin(self.user_codes, codes)
+
+    def filter(self, mask) -> "MonthLedger":
+        """Rows selected by a boolean mask (dictionaries are shared)."""
+        return MonthLedger(
+            self.ids[mask], self.descriptions[mask], self.amounts[mask], self.dates[mask],
+            self.annie[mask], self.category_codes[mask], self.user_codes[mask],
+            self.category_ids, self.category_names, self.user_ids, self.user_names,
+            self.archived[mask]
+        )
+
+    def total(self) -> float:
+        """Sum of all amounts."""
+        return int(self.amounts.sum()) / MINOR_UNITS
+
+    def annie_total(self) -> float:
+        """Sum of Annie-related amounts."""
+        return int(self.amounts[self.annie].sum()) / MINOR_UNITS
+
+    def _group_totals(self, codes, keys) -> dict:
+        valid = codes >= 0
+        sums = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(sums, codes[valid], self.amounts[valid])
+        return {key: int(total) / MINOR_UNITS for key, total in zip(keys, sums)}
+
+    def spending_by_category(self) -> dict:
+        """Totals keyed by category id (uncategorized rows excluded)."""
+        return self._group_totals(self.category_codes, self.category_ids)
+
+    def spending_by_user(self) -> dict:
+        """Totals keyed by user id."""
+        return self._group_totals(self.user_codes, self.user_ids)
+
+    def rows(self):
+        """Yield rows as dicts in the shape returned by get_monthly_transactions."""
+        for i in range(len(self)):
+            category_code = self.category_codes[i]
+            user_code = self.user_codes[i]
+            category_name = self.category_names[category_code] if category_code >= 0 else None
+            user_name = self.user_names[user_code] if user_code >= 0 else None
+            yield {
+                "id": self.ids[i],
+                "description": self.descriptions[i],
+                "amount": int(self.amounts[i]) / MINOR_UNITS,
+                "date": date.fromordinal(int(self.dates[i])).isoformat() if self.dates[i] else None,
+                "is_annie_related": bool(self.annie[i]),
+                "category_id": self.category_ids[category_code] if category_code >= 0 else None,
+                "user_id": self.user_ids[user_code] if user_code >= 0 else None,
+                "categories": {"name": category_name} if category_name else None,
+                "profiles": {"display_name": user_name} if user_name else None,
+                "archived": bool(self.archived[i]),
+            }
@@ -1,59 +1,110 @@
 import json
-import re
+import time
 from datetime import date
 from typing import Optional
-from gemini_client import get_gemini_model
-
-SYSTEM_PROMPT = """Parse input as JSON. k=thousand, M=million.
-
-EXPENSE: {"type":"expense","amount":NUMBER,"description":"TEXT","category":"NAME","is_annie_related":BOOL,"date":"YYYY-MM-DD or null"}
-CATEGORY CMD: {"type":"category","action":"add|update|remove","name":"NAME","budget":NUMBER or null}
-
-Rules: "add/set X 5M"=category cmd. "coffee 50k"=expense. Annie/baby/child=is_annie_related:true.
+from gemini_client import (
+    MODEL_NAME, SCHEMA_VERSION, get_gemini_model, get_rate_limiter, get_parse_flight,
+    build_response_schema, estimate_cost,
+)
+from rate_limit import RateLimitExceeded
+
+SYSTEM_PROMPT = """Parse input. k=thousand, M=million.
+"add/set X 5M"=category cmd (action,name,budget). "coffee 50k"=expense. Annie/baby/child=is_annie_related:true. date=YYYY-MM-DD or null.
 """
 
+# Longer inputs are truncated to keep the prompt within budget
+MAX_INPUT_CHARS = 200
+
 
 def parse_input(user_input: str, model=None, categories: list = None) -> dict:
     """
     Parse natural language input into either expense or category command.
+    The result carries a "usage" dict with token counts, latency and cost.
+    Errors carry "retryable": True when the call failed for a transient cause.
+    Identical requests already in flight share one model call; the followers
+    report zero tokens so usage is not double counted.
     """
+    # The SDK reports "models/<name>"; normalise so the default model shares a key with None
+    model_name = (getattr(model, "model_name", None) or MODEL_NAME).removeprefix("models/")
+    key = (model_name, SCHEMA_VERSION, user_input.strip(), tuple(categories or ()), date.today().isoformat())
+    result, shared = get_parse_flight().do(key, lambda: _parse_input(user_input, model, categories))
+    result = dict(result)
+    if shared:
+        result["raw_input"] = user_input
+        result["usage"] = dict(result["usage"], prompt_tokens=0, output_tokens=0, cost_usd=0.0, coalesced=True)
+    return result
+
+
+def _parse_input(user_input: str, model, categories: list) -> dict:
+    """Rate-limited model call behind parse_input."""
     if model is None:
         model = get_gemini_model()
 
     today = date.today().isoformat()
 
-    # Build prompt with available categories if provided
+    # Send short category codes instead of names; the schema limits output to them
+    codes = [str(i) for i in range(len(categories))] if categories else None
     category_hint = ""
+    generation_config = None
     if categories:
-        category_hint = f"\n\nAvailable categories: {', '.join(categories)}. Use one of these for expenses, or 'Other' if none fit."
+        category_hint = "\nCategory codes (null if none fit): " + ",".join(f"{c}={n}" for c, n in zip(codes, categories))
+        generation_config = {"response_schema": build_response_schema(codes)}
 
-    prompt = f"{SYSTEM_PROMPT}{category_hint}\n\nToday's date is {today}.\n\nParse this: {user_input}"
+    prompt = f"{SYSTEM_PROMPT}{category_hint}\nToday: {today}\nInput: {user_input[:MAX_INPUT_CHARS]}"
 
+    usage = {"prompt_tokens": 0, "output_tokens": 0, "latency_ms": 0.0, "queue_wait_ms": 0.0, "cost_usd": 0.0}
+    start = time.perf_counter()
     try:
+        usage["queue_wait_ms"] = get_rate_limiter().acquire() * 1000
+        start = time.perf_counter()
         response = model.generate_content(
             prompt,
+            generation_config=generation_config,
             request_options={"timeout": 30}
         )
-        response_text = response.text.strip()
-
-        # Clean up response (remove markdown code blocks if present)
-        if response_text.startswith("```"):
-            response_text = re.sub(r"```json?\n?", "", response_text)
-            response_text = re.sub(r"\n?```$", "", response_text)
-
-        parsed = json.loads(response_text)
+        usage["latency_ms"] = (time.perf_counter() - start) * 1000
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata:
+            usage["prompt_tokens"] = metadata.prompt_token_count
+            usage["output_tokens"] = metadata.candidates_token_count
+            usage["cost_usd"] = estimate_cost(usage["prompt_tokens"], usage["output_tokens"])
+
+        parsed = json.loads(response.text)
         parsed["raw_input"] = user_input
 
+        # Map the category code back to its name
+        if categories and parsed.get("category") in codes:
+            parsed["category"] = categories[int(parsed["category"])]
+        elif not parsed.get("category"):
+            parsed["category"] = "Other"
+
         # Handle based on type
         if parsed.get("type") == "category":
-            return _normalize_category_command(parsed)
+            result = _normalize_category_command(parsed)
         else:
-            return _normalize_expense(parsed, today)
+            result = _normalize_expense(parsed, today)
 
     except json.JSONDecodeError as e:
-        return {"error": f"Failed to parse AI response: {e}", "raw_input": user_input}
+        result = {"error": f"Failed to parse AI response: {e}", "raw_input": user_input}
     except Exception as e:
-        return {"error": f"Parsing error: {e}", "raw_input": user_input}
+        result = {"error": f"Parsing error: {e}", "raw_input": user_input, "retryable": _is_transient(e)}
+
+    if not usage["latency_ms"]:
+        usage["latency_ms"] = (time.perf_counter() - start) * 1000
+    result["usage"] = usage
+    return result
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed call is worth retrying (rate limit, network or timeout)."""
+    if isinstance(error, (RateLimitExceeded, TimeoutError, ConnectionError)):
+        return True
+    try:
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (api_exceptions.TooManyRequests, api_exceptions.ServiceUnavailable,
+                              api_exceptions.DeadlineExceeded, api_exceptions.InternalServerError))
 
 
 def _normalize_expense(parsed: dict, today: str) -> dict:
@@ -64,8 +115,8 @@ def _normalize_expense(parsed: dict, today: str) -> dict:
     return {
         "type": "expense",
         "amount": float(parsed.get("amount", 0)),
-        "description": parsed.get("description", ""),
-        "category": parsed.get("category", "Other"),
+        "description": parsed.get("description") or "",
+        "category": parsed.get("category") or "Other",
         "is_annie_related": bool(parsed.get("is_annie_related", False)),
         "date": _normalize_date(parsed.get("date"), today),
         "raw_input": parsed.get("raw_input", "")
@@ -74,11 +125,11 @@ def _normalize_expense(parsed: dict, today: str) -> dict:
 
 def _normalize_category_command(parsed: dict) -> dict:
     """Normalize category command data."""
-    action = parsed.get("action", "").lower()
+    action = (parsed.get("action") or "").lower()
     if action not in ["add", "update", "remove"]:
         return {"error": f"Unknown category action: {action}", "raw_input": parsed.get("raw_input", "")}
 
-    name = parsed.get("name", "").strip()
+    name = (parsed.get("name") or "").strip()
     if not name:
         return {"error": "Category name is required", "raw_input": parsed.get("raw_input", "")}
 
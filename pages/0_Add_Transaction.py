@@ -1,7 +1,6 @@
 import streamlit as st
-from gemini_client import get_gemini_model
 from database import load_categories, get_category_map, get_category_names
-from components import render_budget, render_smart_input
+from components import render_budget, render_smart_input, render_usage_report
 
 # Get client and user from session state (set by app.py)
 if "client" not in st.session_state or "user" not in st.session_state:
@@ -10,20 +9,21 @@ if "client" not in st.session_state or "user" not in st.session_state:
 
 client = st.session_state["client"]
 user = st.session_state["user"]
-
-# Initialize Gemini model
-model = get_gemini_model()
+household_id = st.session_state["household_id"]
 
 # Load data
-categories_data = load_categories(client)
+categories_data = load_categories(client, household_id)
 categories = get_category_map(categories_data)
 category_names = get_category_names(categories_data)
 
 # Layout
 st.title("Annie Budget")
 
-render_smart_input(client, user, model, categories, category_names)
+render_smart_input(client, user, household_id, categories, category_names)
 
 st.divider()
 
-render_budget(client, categories_data)
+render_budget(client, household_id, categories_data)
+
+with st.expander("AI usage"):
+    render_usage_report(client, household_id)
@@ -1,6 +1,11 @@
 import streamlit as st
 import database as db
 from database import load_categories
+from datetime import date, datetime
+from scheduler import get_scheduler
+from archive import KEEP_CLOSED_YEARS, archive_year, restore_year
+from prefetch import get_prefetcher
+from auth import is_operator
 
 # Get client from session state (set by app.py)
 if "client" not in st.session_state:
@@ -8,6 +13,7 @@ if "client" not in st.session_state:
     st.stop()
 
 client = st.session_state["client"]
+household_id = st.session_state["household_id"]
 
 st.title("Categories")
 
@@ -16,10 +22,11 @@ st.subheader("Add Category")
 with st.form("add_category_form"):
     new_name = st.text_input("Name")
     new_budget = st.number_input("Monthly Budget (₫)", min_value=0.0, step=100000.0)
+    new_fixed = st.checkbox("Fixed cost (bills, rent, tuition)")
     submitted = st.form_submit_button("Add Category", type="primary", use_container_width=True)
     if submitted and new_name:
         try:
-            db.add_category(client, new_name, new_budget)
+            db.add_category(client, household_id, new_name, new_budget, new_fixed)
             st.success(f"Added {new_name}")
             st.cache_data.clear()
             st.rerun()
@@ -30,7 +37,7 @@ st.divider()
 
 # Edit existing categories
 st.subheader("Existing Categories")
-categories_data = load_categories(client)
+categories_data = load_categories(client, household_id)
 
 if categories_data:
     for cat in categories_data:
@@ -47,6 +54,7 @@ if categories_data:
                 label_visibility="collapsed",
                 step=100000.0
             )
+            is_fixed = st.checkbox("Fixed cost", value=bool(cat.get("is_fixed")), key=f"fixed_{cat['id']}")
 
             # Action buttons side by side
             pending_delete = st.session_state.get("confirm_delete_category")
@@ -56,7 +64,7 @@ if categories_data:
                 with col1:
                     if st.button("Confirm", key=f"confirm_{cat['id']}", type="primary", use_container_width=True):
                         try:
-                            db.delete_category(client, cat["id"])
+                            db.delete_category(client, household_id, cat["id"])
                             del st.session_state["confirm_delete_category"]
                             st.cache_data.clear()
                             st.rerun()
@@ -71,7 +79,7 @@ if categories_data:
                 with col1:
                     if st.button("Save", key=f"update_{cat['id']}", use_container_width=True):
                         try:
-                            db.update_category(client, cat["id"], new_budget)
+                            db.update_category(client, household_id, cat["id"], new_budget, is_fixed)
                             st.success("Updated")
                             st.cache_data.clear()
                             st.rerun()
@@ -85,3 +93,53 @@ if categories_data:
             st.divider()
 else:
     st.info("No categories yet. Add one above.")
+
+# Background maintenance: process-wide jobs are for operators only
+with st.expander("Maintenance"):
+    if is_operator(st.session_state.get("user")):
+        scheduler = get_scheduler(client)
+        for job in scheduler.status():
+            if job["last_run"]:
+                last_run = datetime.fromtimestamp(job["last_run"]).strftime("%Y-%m-%d %H:%M")
+                outcome = f"error: {job['last_error']}" if job["last_error"] else f"result {job['last_result']}"
+                st.write(f"**{job['name']}** · {last_run} · {job['last_duration']:.2f}s · {outcome}")
+            else:
+                st.write(f"**{job['name']}** · not run yet")
+            st.caption(f"Next run {datetime.fromtimestamp(job['next_run']).strftime('%Y-%m-%d %H:%M')}")
+            if st.button("Run now", key=f"run_job_{job['name']}"):
+                if not scheduler.run_now(job["name"]):
+                    st.warning("Already running")
+                st.rerun()
+        st.divider()
+
+    st.write("**Archive**")
+    st.caption("Closed years are moved out of the live table; their totals stay in budgets and trends, "
+               "and archived months still list their transactions read-only.")
+    archive_year_input = st.number_input("Year", min_value=2000, max_value=date.today().year - 1,
+                                         value=date.today().year - 1 - KEEP_CLOSED_YEARS, step=1)
+    col_archive, col_verify, col_restore = st.columns(3, gap="small")
+    with col_archive:
+        if st.button("Archive", use_container_width=True):
+            try:
+                result = archive_year(client, household_id, int(archive_year_input))
+                st.success(f"Archived {result['rows']} transactions from {result['year']}")
+                st.cache_data.clear()
+                get_prefetcher(client, household_id).invalidate()
+            except Exception as e:
+                st.error(f"Error: {e}")
+    with col_verify:
+        if st.button("Verify", use_container_width=True):
+            check = db.verify_archive(client, household_id, int(archive_year_input))
+            if check["ok"]:
+                st.success(f"{check['months']} months, {check['rows']} transactions, {float(check['total']):,.0f}₫ check out")
+            else:
+                st.error(f"Mismatches: {check['mismatches']}")
+    with col_restore:
+        if st.button("Restore", use_container_width=True):
+            try:
+                result = restore_year(client, household_id, int(archive_year_input))
+                st.success(f"Restored {result['rows']} transactions to {result['year']}")
+                st.cache_data.clear()
+                get_prefetcher(client, household_id).invalidate()
+            except Exception as e:
+                st.error(f"Error: {e}")
@@ -0,0 +1,64 @@
+import streamlit as st
+from search import COUNT_CAP, search_transactions
+
+PAGE_SIZE = 20
+
+# Get client from session state (set by app.py)
+if "client" not in st.session_state:
+    st.error("Session not initialized. Please refresh the page.")
+    st.stop()
+
+client = st.session_state["client"]
+household_id = st.session_state["household_id"]
+
+st.title("Search")
+
+query = st.text_input(
+    "Search",
+    placeholder="coffee, tuition, Annie toys...",
+    label_visibility="collapsed"
+)
+
+# Reset to the first page whenever the query changes
+if st.session_state.get("search_query") != query:
+    st.session_state["search_query"] = query
+    st.session_state["search_page"] = 0
+
+if query.strip():
+    page = st.session_state["search_page"]
+    try:
+        results, total = search_transactions(client, household_id, query.strip(), PAGE_SIZE, page * PAGE_SIZE)
+    except Exception as e:
+        st.error(f"Search error: {e}")
+        st.stop()
+
+    if results:
+        st.caption(f"{total}+ matches" if total >= COUNT_CAP else f"{total} matches")
+        st.divider()
+
+        for tx in results:
+            annie_tag = " 👶" if tx.get("is_annie_related") else ""
+            st.markdown(f"**{float(tx['amount']):,.0f}₫** · **{tx['description']}{annie_tag}**")
+            meta_parts = [tx.get("date") or ""]
+            if tx.get("category_name"):
+                meta_parts.append(tx["category_name"])
+            if tx.get("display_name"):
+                meta_parts.append(tx["display_name"])
+            st.caption(" · ".join(meta_parts))
+            st.divider()
+
+        # Pagination
+        last_page = (total - 1) // PAGE_SIZE
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("Previous", disabled=page == 0, use_container_width=True):
+                st.session_state["search_page"] = page - 1
+                st.rerun()
+        with col_page:
+            st.caption(f"Page {page + 1} of {last_page + 1}")
+        with col_next:
+            if st.button("Next", disabled=page >= last_page, use_container_width=True):
+                st.session_state["search_page"] = page + 1
+                st.rerun()
+    else:
+        st.info(f"No transactions matching \"{query.strip()}\"")
@@ -0,0 +1,62 @@
+import streamlit as st
+from datetime import date
+from database import load_categories, get_all_profiles
+from trends import month_start, load_monthly_totals, choose_granularity, build_trend_frame
+
+# Get client from session state (set by app.py)
+if "client" not in st.session_state:
+    st.error("Session not initialized. Please refresh the page.")
+    st.stop()
+
+client = st.session_state["client"]
+household_id = st.session_state["household_id"]
+
+st.title("Trends")
+
+col1, col2 = st.columns(2)
+with col1:
+    years = st.selectbox(
+        "Range",
+        options=[1, 2, 3, 5, 10],
+        index=3,
+        format_func=lambda y: f"Last {y} year{'s' if y > 1 else ''}"
+    )
+with col2:
+    breakdown = st.selectbox(
+        "Breakdown",
+        options=["category", "user", "annie"],
+        format_func=lambda b: {"category": "By category", "user": "By user", "annie": "Annie vs household"}[b]
+    )
+
+today = date.today()
+end = month_start(today.year, today.month + 1)
+start = month_start(today.year - years, today.month + 1)
+months = years * 12
+
+try:
+    rows = load_monthly_totals(client, household_id, start, end)
+except Exception as e:
+    st.error(f"Error loading trends: {e}")
+    st.stop()
+
+if breakdown == "category":
+    labels = {cat["id"]: cat["name"] for cat in load_categories(client, household_id) or []}
+elif breakdown == "user":
+    labels = {p["id"]: p["display_name"] for p in get_all_profiles(client, household_id) or []}
+else:
+    labels = {}
+
+granularity = choose_granularity(months)
+frame = build_trend_frame(rows, breakdown, labels, granularity)
+
+if frame.empty:
+    st.info("No transactions in this range.")
+    st.stop()
+
+st.caption(f"{start.strftime('%b %Y')} – {today.strftime('%b %Y')} · by {granularity}")
+st.bar_chart(frame)
+
+# Totals per series over the whole range
+totals = frame.sum().sort_values(ascending=False)
+for series, total in totals.items():
+    st.write(f"{series}: {total:,.0f}₫")
@@ -0,0 +1,129 @@
+import streamlit as st
+from datetime import date, timedelta
+import database as db
+from database import load_categories, get_category_map, get_category_names
+from recurring import CronSchedule, CronError, generate_recurring
+from prefetch import get_prefetcher
+
+# Get client and user from session state (set by app.py)
+if "client" not in st.session_state or "user" not in st.session_state:
+    st.error("Session not initialized. Please refresh the page.")
+    st.stop()
+
+client = st.session_state["client"]
+user = st.session_state["user"]
+household_id = st.session_state["household_id"]
+
+categories_data = load_categories(client, household_id)
+categories = get_category_map(categories_data)
+category_names = get_category_names(categories_data)
+
+st.title("Recurring")
+
+# Add new template
+st.subheader("Add Recurring Transaction")
+with st.form("add_recurring_form"):
+    description = st.text_input("Description", placeholder="Rent, tuition, electricity...")
+    amount = st.number_input("Amount (₫)", min_value=0.0, step=100000.0)
+    category = st.selectbox("Category", options=category_names)
+    schedule = st.text_input(
+        "Schedule (cron)",
+        value="0 0 1 * *",
+        help="minute hour day-of-month month day-of-week. Examples: '0 0 1 * *' on the 1st of "
+             "every month, '0 0 15 1,7 *' on 15 Jan and 15 Jul, '0 0 * * 1' every Monday."
+    )
+    start_date = st.date_input("Start date", value=date.today())
+    is_annie = st.checkbox("Annie-related")
+    submitted = st.form_submit_button("Add", type="primary", use_container_width=True)
+    if submitted and description:
+        try:
+            CronSchedule(schedule)
+            db.add_recurring_transaction(
+                client, household_id, user.id, amount, description,
+                categories.get(category), is_annie, schedule, start_date.isoformat()
+            )
+            st.success(f"Added {description}")
+            st.rerun()
+        except CronError as e:
+            st.error(f"Invalid schedule: {e}")
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+st.divider()
+
+# Generate due occurrences now (also runs daily in the background)
+col_generate, col_backfill = st.columns(2, gap="small")
+with col_generate:
+    if st.button("Generate due", use_container_width=True):
+        try:
+            created = generate_recurring(client, household_id)
+            st.success(f"Created {created} transactions")
+            st.cache_data.clear()
+            get_prefetcher(client, household_id).invalidate()
+        except Exception as e:
+            st.error(f"Error: {e}")
+with col_backfill:
+    if st.button("Backfill missed", use_container_width=True,
+                 help="Create any occurrences missing since each template's start date (archived years are left as they are)"):
+        try:
+            created = generate_recurring(client, household_id, backfill=True)
+            st.success(f"Backfilled {created} transactions")
+            st.cache_data.clear()
+            get_prefetcher(client, household_id).invalidate()
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+st.divider()
+
+# Existing templates
+templates = db.get_recurring_transactions(client, household_id)
+
+if templates:
+    for template in templates:
+        with st.container():
+            cat_name = template.get("categories", {}).get("name", "") if template.get("categories") else ""
+            paused = "" if template.get("active") else " · paused"
+            st.markdown(f"**{float(template['amount']):,.0f}₫** · **{template['description']}**")
+            meta_parts = [f"`{template['schedule']}`"]
+            if cat_name:
+                meta_parts.append(cat_name)
+            if template.get("last_generated_date"):
+                meta_parts.append(f"generated through {template['last_generated_date']}")
+            st.caption(" · ".join(meta_parts) + paused)
+
+            if st.session_state.get("confirm_delete_recurring") == template["id"]:
+                st.warning(f"Delete **{template['description']}**? Transactions already generated are kept.")
+                col1, col2 = st.columns(2, gap="small")
+                with col1:
+                    if st.button("Confirm", key=f"confirm_{template['id']}", type="primary", use_container_width=True):
+                        try:
+                            db.delete_recurring_transaction(client, household_id, template["id"])
+                            del st.session_state["confirm_delete_recurring"]
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+                with col2:
+                    if st.button("Cancel", key=f"cancel_{template['id']}", use_container_width=True):
+                        del st.session_state["confirm_delete_recurring"]
+                        st.rerun()
+            else:
+                col1, col2 = st.columns(2, gap="small")
+                with col1:
+                    label = "Pause" if template.get("active") else "Resume"
+                    if st.button(label, key=f"toggle_{template['id']}", use_container_width=True):
+                        if template.get("active"):
+                            db.set_recurring_active(client, household_id, template["id"], False)
+                        else:
+                            # Resume from today; the paused period is only filled by Backfill missed
+                            yesterday = (date.today() - timedelta(days=1)).isoformat()
+                            through = max(template.get("last_generated_date") or "", yesterday)
+                            db.set_recurring_active(client, household_id, template["id"], True, through)
+                        st.rerun()
+                with col2:
+                    if st.button("Delete", key=f"delete_{template['id']}", use_container_width=True):
+                        st.session_state["confirm_delete_recurring"] = template["id"]
+                        st.rerun()
+
+            st.divider()
+else:
+    st.info("No recurring transactions yet. Add one above.")
@@ -0,0 +1,51 @@
+import streamlit as st
+from analytics import EXAMPLE_QUERIES, QueryError, get_snapshot
+
+# Get client from session state (set by app.py)
+if "client" not in st.session_state:
+    st.error("Session not initialized. Please refresh the page.")
+    st.stop()
+
+client = st.session_state["client"]
+household_id = st.session_state["household_id"]
+
+st.title("Analytics")
+
+snapshot = get_snapshot(household_id)
+if snapshot.status()["synced_at"] is None:
+    with st.spinner("Building snapshot..."):
+        snapshot.sync(client, rebuild=True)
+
+status = snapshot.status()
+st.caption(
+    f"Local snapshot of {status['rows']:,} transactions · synced {status['synced_at']:%Y-%m-%d %H:%M} UTC. "
+    "New entries, edits and deletions sync hourly, or sync now."
+)
+col_sync, col_rebuild = st.columns(2, gap="small")
+with col_sync:
+    if st.button("Sync now", use_container_width=True):
+        copied = snapshot.sync(client)
+        st.success(f"Copied {copied} new or edited transactions")
+with col_rebuild:
+    if st.button("Rebuild", use_container_width=True):
+        snapshot.sync(client, rebuild=True)
+        st.success("Snapshot rebuilt")
+
+example = st.selectbox("Example", options=list(EXAMPLE_QUERIES))
+sql = st.text_area("SQL", value=EXAMPLE_QUERIES[example], height=180)
+
+if st.button("Run", type="primary", use_container_width=True):
+    try:
+        frame, elapsed_ms = snapshot.query(sql)
+        st.caption(f"{len(frame):,} rows · {elapsed_ms:,.1f} ms")
+        st.dataframe(frame, use_container_width=True, hide_index=True)
+    except QueryError as e:
+        st.error(f"Query error: {e}")
+
+with st.expander("Tables"):
+    current = None
+    for table, column, data_type in snapshot.tables():
+        if table != current:
+            st.write(f"**{table}**")
+            current = table
+        st.caption(f"{column} · {data_type}")
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+import streamlit as st
+import database as db
+
+MAX_MONTHS = 12
+WORKERS = 2
+# Other household members keep adding entries, so cached months go stale
+TTL_SECONDS = 60
+
+
+def _shift_month(year: int, month: int, delta: int):
+    """Return (year, month) moved by delta months."""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+class MonthPrefetcher:
+    """Bounded per-session cache of monthly transactions and spending totals.
+
+    While the user reads one month, the previous and next months are loaded on a
+    small thread pool so switching the month selector is served from memory.
+    """
+
+    def __init__(self, client, household_id: str, max_months: int = MAX_MONTHS, workers: int = WORKERS):
+        self.client = client
+        self.household_id = household_id
+        self.max_entries = max_months * 2
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="month-prefetch")
+        self._cache = OrderedDict()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "prefetched": 0, "cancelled": 0}
+
+    def _load(self, kind: str, year: int, month: int):
+        if kind == "transactions":
+            # numpy loads with the first month, not with the page
+            from ledger import MonthLedger
+
+            return MonthLedger.from_transactions(db.get_monthly_transactions(self.client, self.household_id, year, month).data)
+        if kind == "fixed_variable":
+            return db.get_fixed_variable_spending(self.client, self.household_id, year, month)
+        return db.get_monthly_spending(self.client, self.household_id, year, month)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _fresh(self, key):
+        """Whether key is cached and younger than TTL_SECONDS (caller holds the lock)."""
+        entry = self._cache.get(key)
+        return entry is not None and time.monotonic() - entry[0] < TTL_SECONDS
+
+    def _get(self, kind: str, year: int, month: int):
+        key = (kind, year, month)
+        with self._lock:
+            if self._fresh(key):
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._cache[key][1]
+            future = self._futures.get(key)
+
+        # A prefetch already in flight still saves the user a full round trip
+        if future is not None:
+            try:
+                value = future.result()
+                with self._lock:
+                    self.stats["hits"] += 1
+                return value
+            except (CancelledError, Exception):
+                pass
+
+        with self._lock:
+            self.stats["misses"] += 1
+        value = self._load(kind, year, month)
+        self._store(key, value)
+        return value
+
+    def get_transactions(self, year: int, month: int):
+        """Get a month's transactions as a MonthLedger, from cache when possible."""
+        return self._get("transactions", year, month)
+
+    def get_spending(self, year: int, month: int):
+        """Get a month's spending totals by category, from cache when possible."""
+        return self._get("spending", year, month)
+
+    def get_fixed_variable(self, year: int, month: int):
+        """Get a month's (fixed, variable) spending totals, from cache when possible."""
+        return self._get("fixed_variable", year, month)
+
+    def prefetch_around(self, year: int, month: int):
+        """Load the neighbouring months in the background, cancelling stale work."""
+        wanted = set()
+        for delta in (-1, 1):
+            y, m = _shift_month(year, month, delta)
+            for kind in ("transactions", "spending"):
+                wanted.add((kind, y, m))
+        wanted.add(("spending", year, month))
+
+        with self._lock:
+            for key, future in list(self._futures.items()):
+                if key not in wanted and future.cancel():
+                    self.stats["cancelled"] += 1
+                if future.done():
+                    del self._futures[key]
+
+            for key in wanted:
+                if self._fresh(key) or key in self._futures:
+                    continue
+                self._futures[key] = self._executor.submit(self._prefetch, key, self._generation)
+
+    def _prefetch(self, key, generation: int):
+        value = self._load(*key)
+        # Results that started before an invalidate() may be stale
+        if generation == self._generation:
+            self._store(key, value)
+            with self._lock:
+                self.stats["prefetched"] += 1
+                self._futures.pop(key, None)
+        return value
+
+    def invalidate(self):
+        """Drop all cached months (call after a transaction is changed)."""
+        with self._lock:
+            self._generation += 1
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._cache.clear()
+
+
+def get_prefetcher(client, household_id: str):
+    """Get the month prefetcher for the current user session."""
+    prefetcher = st.session_state.get("month_prefetcher")
+    if prefetcher is None or prefetcher.household_id != household_id:
+        prefetcher = MonthPrefetcher(client, household_id)
+        st.session_state["month_prefetcher"] = prefetcher
+    return prefetcher
@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would wait longer than the limiter allows."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a short, bounded wait queue.
+
+    Tokens refill continuously at rate_per_minute. A caller that finds the bucket
+    empty reserves the next token and sleeps until it is due, unless that wait
+    exceeds max_wait or max_waiters callers are already queued, in which case
+    RateLimitExceeded is raised immediately.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = None, max_wait: float = 5.0, max_waiters: int = 8):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst or max(1, int(rate_per_minute // 6))
+        self.max_wait = max_wait
+        self.max_waiters = max_waiters
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._waiters = 0
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "rejected": 0, "waited": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting if needed. Returns the seconds waited."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait and (wait > self.max_wait or self._waiters >= self.max_waiters):
+                self._tokens += 1
+                self.stats["rejected"] += 1
+                raise RateLimitExceeded(f"Rate limit reached, retry in {wait:.0f}s")
+            if wait:
+                self._waiters += 1
+
+        if wait:
+            time.sleep(wait)
+
+        with self._lock:
+            if wait:
+                self._waiters -= 1
+                self.stats["waited"] += 1
+            self.stats["acquired"] += 1
+            self.stats["total_wait_ms"] += wait * 1000
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait * 1000)
+        return wait
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for and share its result instead of making their own call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, func):
+        """Run func once per in-flight key. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats["calls"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+import database as db
+
+# Day-of-week in cron counts from Sunday = 0 (7 is also Sunday)
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+class CronError(ValueError):
+    """Raised for an invalid cron schedule."""
+
+
+def _parse_field(field: str, low: int, high: int) -> set:
+    """Expand one cron field (*, n, a-b, lists and /step) into a set of values."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            if not step_str.isdigit() or int(step_str) == 0:
+                raise CronError(f"Invalid step in '{field}'")
+            step = int(step_str)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            if not (start_str.isdigit() and end_str.isdigit()):
+                raise CronError(f"Invalid range in '{field}'")
+            start, end = int(start_str), int(end_str)
+        elif part.isdigit():
+            start = end = int(part)
+            if step > 1:
+                end = high
+        else:
+            raise CronError(f"Invalid value '{part}'")
+        if start < low or end > high or start > end:
+            raise CronError(f"'{field}' is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Date matcher for a 5-field cron expression.
+
+    Transactions are dated, not timed, so the minute and hour fields are
+    validated but ignored. As in cron, when both day-of-month and day-of-week
+    are restricted a date matches if either does.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise CronError("Schedule must have 5 fields: minute hour day-of-month month day-of-week")
+        parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, _FIELD_RANGES)]
+        self.expression = expression
+        self.days = parsed[2]
+        self.months = parsed[3]
+        self.weekdays = {d % 7 for d in parsed[4]}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def matches(self, day: date) -> bool:
+        """Whether the schedule fires on a date."""
+        if day.month not in self.months:
+            return False
+        dom = day.day in self.days
+        dow = (day.isoweekday() % 7) in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return dow
+        if self.any_weekday:
+            return dom
+        return dom or dow
+
+    def occurrences(self, start: date, end: date):
+        """Dates in [start, end] on which the schedule fires."""
+        day = start
+        while day <= end:
+            if self.matches(day):
+                yield day
+            day += timedelta(days=1)
+
+
+def due_dates(template: dict, through: date, backfill: bool = False) -> list:
+    """Occurrence dates of a template that still need materializing.
+
+    Normal runs continue from the day after last_generated_date; a template that
+    has never run starts at the later of its start date and the first of the
+    month, so a new template doesn't flood past months. Backfill starts at the
+    template's start date and relies on the unique (recurring_id, date) key to
+    skip occurrences that already exist.
+    """
+    start = date.fromisoformat(template["start_date"])
+    if not backfill:
+        if template.get("last_generated_date"):
+            start = max(start, date.fromisoformat(template["last_generated_date"]) + timedelta(days=1))
+        else:
+            start = max(start, through.replace(day=1))
+    end = through
+    if template.get("end_date"):
+        end = min(end, date.fromisoformat(template["end_date"]))
+    if start > end:
+        return []
+    return list(CronSchedule(template["schedule"]).occurrences(start, end))
+
+
+def generate_recurring(client, household_id: str, through: date = None, backfill: bool = False) -> int:
+    """Materialize due occurrences of a household's active templates in one bulk insert.
+
+    Idempotent: re-running for the same period inserts nothing. Dates in
+    archived months are skipped, since the unique key can't see occurrences
+    already moved to the archive. Returns the number of transactions created.
+    """
+    through = through or date.today()
+    templates = db.get_recurring_transactions(client, household_id, active_only=True)
+    archived = db.load_archived_months(client, household_id)
+
+    transactions = []
+    generated = []
+    for template in templates:
+        dates = [day for day in due_dates(template, through, backfill)
+                 if day.replace(day=1).isoformat() not in archived]
+        for day in dates:
+            transaction = {
+                "recurring_id": template["id"],
+                "user_id": template.get("user_id"),
+                "category_id": template.get("category_id"),
+                "amount": template["amount"],
+                "description": template["description"],
+                "is_annie_related": template.get("is_annie_related", False),
+                "date": day.isoformat(),
+            }
+            transactions.append(transaction)
+        if (template.get("last_generated_date") or "") < through.isoformat():
+            generated.append(template["id"])
+
+    inserted = db.add_recurring_occurrences(client, household_id, transactions)
+    for recurring_id in generated:
+        db.set_recurring_generated(client, household_id, recurring_id, through.isoformat())
+    return inserted
+
+
+def generate_all_households(client) -> int:
+    """Run the generator for every household (scheduled daily)."""
+    return sum(generate_recurring(client, household_id) for household_id in db.get_household_ids(client))
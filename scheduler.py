@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+import streamlit as st
+import database as db
+from recurring import generate_all_households
+from archive import archive_closed_years
+from analytics import sync_all_households
+
+# Hour (server local time) by which caches should be warm for the morning peak
+MORNING_PEAK_HOUR = 7
+
+
+class Job:
+    """A periodic maintenance job with its run history."""
+
+    def __init__(self, name: str, func, interval: float, jitter: float = 0, daily_at: int = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.daily_at = daily_at
+        self.lock = threading.Lock()
+        self.next_run = self._schedule_next(time.time())
+        self.last_run = None
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+        self.runs = 0
+
+    def _schedule_next(self, now: float) -> float:
+        if self.daily_at is None:
+            base = now + self.interval
+        else:
+            # Next occurrence of daily_at, finishing up to jitter seconds early
+            current = datetime.fromtimestamp(now)
+            target = current.replace(hour=self.daily_at, minute=0, second=0, microsecond=0)
+            if target.timestamp() - self.jitter <= now:
+                target += timedelta(days=1)
+            return target.timestamp() - random.uniform(0, self.jitter)
+        return base + random.uniform(0, self.jitter)
+
+    def run(self) -> bool:
+        """Run the job unless it is already running. Returns whether it ran."""
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            start = time.time()
+            try:
+                self.last_result = self.func()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self.last_run = start
+            self.last_duration = time.time() - start
+            self.runs += 1
+            self.next_run = self._schedule_next(time.time())
+            return True
+        finally:
+            self.lock.release()
+
+
+class MaintenanceScheduler:
+    """In-process scheduler for periodic maintenance, shared by all sessions.
+
+    Jobs run one at a time on a daemon thread; each job is single-flight, so a
+    manual trigger never overlaps a scheduled run.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="maintenance-scheduler", daemon=True)
+        self._thread.start()
+
+    def add_job(self, name: str, func, interval: float, jitter: float = 0, daily_at: int = None):
+        """Register a job to run every interval seconds (or daily at an hour)."""
+        self.jobs[name] = Job(name, func, interval, jitter, daily_at)
+        self._wake.set()
+
+    def run_now(self, name: str) -> bool:
+        """Run a job immediately. Returns False if it is already running."""
+        return self.jobs[name].run()
+
+    def status(self):
+        """Last run time, duration and outcome of every job."""
+        return [{
+            "name": job.name,
+            "last_run": job.last_run,
+            "last_duration": job.last_duration,
+            "last_result": job.last_result,
+            "last_error": job.last_error,
+            "next_run": job.next_run,
+            "runs": job.runs,
+        } for job in self.jobs.values()]
+
+    def _run(self):
+        while True:
+            try:
+                now = time.time()
+                jobs = list(self.jobs.values())
+                for job in jobs:
+                    if job.next_run <= now:
+                        job.run()
+                next_run = min((job.next_run for job in jobs), default=now + 60)
+            except Exception:
+                next_run = time.time() + 60
+            self._wake.wait(max(1, min(next_run - time.time(), 60)))
+            self._wake.clear()
+
+
+def _warm_caches(client):
+    """Fill the shared reference-data caches ahead of the morning peak.
+
+    Categories and archived months are cached for a day (writes clear them);
+    the local search index is only built when searches fall back to it. Month
+    transactions and spending are cached per session by the prefetcher, so
+    there is nothing process-wide to warm for them here.
+    """
+    from search import warm_index
+
+    household_ids = db.get_household_ids(client)
+    for household_id in household_ids:
+        db.load_categories(client, household_id)
+        db.load_archived_months(client, household_id)
+        warm_index(client, household_id)
+    return len(household_ids)
+
+
+@st.cache_resource
+def get_scheduler(_client):
+    """Get the process-wide maintenance scheduler with the standard jobs registered."""
+    scheduler = MaintenanceScheduler()
+    scheduler.add_job("purge_expired_sessions", lambda: db.cleanup_expired_sessions(_client),
+                      interval=3600, jitter=300)
+    scheduler.add_job("generate_recurring", lambda: generate_all_households(_client),
+                      interval=86400, jitter=900, daily_at=MORNING_PEAK_HOUR - 1)
+    scheduler.add_job("warm_caches", lambda: _warm_caches(_client),
+                      interval=86400, jitter=900, daily_at=MORNING_PEAK_HOUR)
+    # Only does work in the first days of a year, once the previous one has aged out
+    scheduler.add_job("archive_closed_years", lambda: archive_closed_years(_client),
+                      interval=86400, jitter=900, daily_at=3)
+    # Edits, deletes and archiving arrive through updated_at and the deletes log
+    scheduler.add_job("sync_analytics", lambda: sync_all_households(_client),
+                      interval=3600, jitter=300)
+    return scheduler
@@ -42,4 +42,709 @@ CREATE TABLE public.sessions (
   email TEXT,
   created_at TIMESTAMPTZ DEFAULT NOW(),
   expires_at TIMESTAMPTZ DEFAULT NOW() + INTERVAL '7 days'
-);
\ No newline at end of file
+);
+
+-- 6. Search: Trigram + full-text indexes over transaction descriptions
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE public.transactions
+  ADD COLUMN search_vector TSVECTOR
+  GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED;
+
+CREATE INDEX transactions_search_vector_idx ON public.transactions USING GIN (search_vector);
+CREATE INDEX transactions_description_trgm_idx ON public.transactions USING GIN (description gin_trgm_ops);
+
+-- Ranked, paginated search across all years (typo tolerant via word similarity)
+-- total_count stops at 1000 so broad queries don't count every match
+CREATE OR REPLACE FUNCTION public.search_transactions(
+  query TEXT,
+  page_size INTEGER DEFAULT 20,
+  page_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  date DATE,
+  amount NUMERIC,
+  description TEXT,
+  is_annie_related BOOLEAN,
+  category_name TEXT,
+  display_name TEXT,
+  rank REAL,
+  total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT t.id, t.date, t.amount, t.description, t.is_annie_related,
+         c.name, p.display_name,
+         GREATEST(ts_rank(t.search_vector, plainto_tsquery('simple', query)),
+                  word_similarity(query, t.description)) AS rank,
+         (SELECT count(*) FROM (
+            SELECT 1 FROM public.transactions m
+            WHERE m.search_vector @@ plainto_tsquery('simple', query) OR query <% m.description
+            LIMIT 1000
+          ) capped) AS total_count
+  FROM public.transactions t
+  LEFT JOIN public.categories c ON c.id = t.category_id
+  LEFT JOIN public.profiles p ON p.id = t.user_id
+  WHERE t.search_vector @@ plainto_tsquery('simple', query)
+     OR query <% t.description
+  ORDER BY rank DESC, t.date DESC
+  LIMIT page_size OFFSET page_offset;
+$$;
+
+-- 7. LLM Usage: Token, latency and cost accounting per parse call
+CREATE TABLE public.llm_usage (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  user_id UUID REFERENCES public.profiles(id) ON DELETE CASCADE,
+  prompt_tokens INTEGER NOT NULL DEFAULT 0,
+  output_tokens INTEGER NOT NULL DEFAULT 0,
+  latency_ms FLOAT,
+  cost_usd NUMERIC(12,8) DEFAULT 0,
+  succeeded BOOLEAN DEFAULT TRUE,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX llm_usage_created_at_idx ON public.llm_usage (created_at);
+
+-- Expired-session purge scans by expiry
+CREATE INDEX sessions_expires_at_idx ON public.sessions (expires_at);
+
+-- 8. Trends: Monthly totals aggregated server-side in one round trip
+CREATE INDEX transactions_date_idx ON public.transactions (date)
+  INCLUDE (category_id, user_id, amount, is_annie_related);
+
+CREATE OR REPLACE FUNCTION public.monthly_totals(start_date DATE, end_date DATE)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT coalesce(jsonb_agg(row_to_json(m) ORDER BY m.month), '[]'::jsonb)
+  FROM (
+    SELECT date_trunc('month', t.date)::date AS month,
+           t.category_id,
+           t.user_id,
+           coalesce(t.is_annie_related, FALSE) AS is_annie_related,
+           SUM(t.amount) AS total,
+           COUNT(*) AS tx_count
+    FROM public.transactions t
+    WHERE t.date >= start_date AND t.date < end_date
+    GROUP BY 1, 2, 3, 4
+  ) m;
+$$;
+
+-- 9. Households: Multi-household tenancy
+-- Every tenant-owned row carries household_id. database.py filters on it
+-- explicitly (see the tenancy note below).
+CREATE TABLE public.households (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  name TEXT NOT NULL,
+  -- Shared with family members to join; the id itself is never shown
+  invite_code TEXT NOT NULL UNIQUE DEFAULT substr(replace(gen_random_uuid()::text, '-', ''), 1, 12),
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE public.profiles ADD COLUMN household_id UUID REFERENCES public.households(id);
+ALTER TABLE public.categories ADD COLUMN household_id UUID REFERENCES public.households(id) ON DELETE CASCADE;
+ALTER TABLE public.transactions ADD COLUMN household_id UUID REFERENCES public.households(id) ON DELETE CASCADE;
+ALTER TABLE public.llm_usage ADD COLUMN household_id UUID REFERENCES public.households(id) ON DELETE CASCADE;
+
+-- Existing data becomes the first household
+WITH first_household AS (
+  INSERT INTO public.households (name) VALUES ('Green Valley') RETURNING id
+)
+UPDATE public.profiles SET household_id = (SELECT id FROM first_household);
+UPDATE public.categories SET household_id = (SELECT household_id FROM public.profiles LIMIT 1);
+UPDATE public.transactions SET household_id = (SELECT household_id FROM public.profiles LIMIT 1);
+UPDATE public.llm_usage SET household_id = (SELECT household_id FROM public.profiles LIMIT 1);
+
+ALTER TABLE public.categories ALTER COLUMN household_id SET NOT NULL;
+ALTER TABLE public.transactions ALTER COLUMN household_id SET NOT NULL;
+
+-- Category names are unique per household, not globally
+ALTER TABLE public.categories DROP CONSTRAINT categories_name_key;
+ALTER TABLE public.categories ADD CONSTRAINT categories_household_name_key UNIQUE (household_id, name);
+
+-- Indexes lead with household_id so per-household cost is independent of tenant count
+DROP INDEX IF EXISTS public.transactions_date_idx;
+CREATE INDEX transactions_household_date_idx ON public.transactions (household_id, date)
+  INCLUDE (category_id, user_id, amount, is_annie_related);
+CREATE INDEX transactions_household_category_idx ON public.transactions (household_id, category_id);
+CREATE INDEX transactions_household_created_at_idx ON public.transactions (household_id, created_at);
+CREATE INDEX profiles_household_idx ON public.profiles (household_id);
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+DROP INDEX IF EXISTS public.transactions_search_vector_idx;
+DROP INDEX IF EXISTS public.transactions_description_trgm_idx;
+CREATE INDEX transactions_household_search_vector_idx ON public.transactions
+  USING GIN (household_id, search_vector);
+CREATE INDEX transactions_household_description_trgm_idx ON public.transactions
+  USING GIN (household_id, description gin_trgm_ops);
+DROP INDEX IF EXISTS public.llm_usage_created_at_idx;
+CREATE INDEX llm_usage_household_created_at_idx ON public.llm_usage (household_id, created_at);
+
+-- Optional for very large deployments: hash-partition the ledger by tenant, e.g.
+--   CREATE TABLE public.transactions (...) PARTITION BY HASH (household_id);
+--   CREATE TABLE public.transactions_p0 PARTITION OF public.transactions
+--     FOR VALUES WITH (MODULUS 16, REMAINDER 0);  -- ... through REMAINDER 15
+
+-- Tenancy is enforced by the app, not row-level security. All sessions, the
+-- entry queue, the scheduler and analytics share one server-side client
+-- created with the service-role key (connections.supabase.key in
+-- .streamlit/secrets.toml), so there is no per-user auth.uid() to filter on.
+-- Every query in database.py filters or stamps household_id explicitly.
+-- The key must never be shipped to a browser.
+
+-- Household-scoped versions of the search and trends functions
+DROP FUNCTION IF EXISTS public.search_transactions(TEXT, INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION public.search_transactions(
+  p_household_id UUID,
+  query TEXT,
+  page_size INTEGER DEFAULT 20,
+  page_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  date DATE,
+  amount NUMERIC,
+  description TEXT,
+  is_annie_related BOOLEAN,
+  category_name TEXT,
+  display_name TEXT,
+  rank REAL,
+  total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT t.id, t.date, t.amount, t.description, t.is_annie_related,
+         c.name, p.display_name,
+         GREATEST(ts_rank(t.search_vector, plainto_tsquery('simple', query)),
+                  word_similarity(query, t.description)) AS rank,
+         (SELECT count(*) FROM (
+            SELECT 1 FROM public.transactions m
+            WHERE m.household_id = p_household_id
+              AND (m.search_vector @@ plainto_tsquery('simple', query) OR query <% m.description)
+            LIMIT 1000
+          ) capped) AS total_count
+  FROM public.transactions t
+  LEFT JOIN public.categories c ON c.id = t.category_id
+  LEFT JOIN public.profiles p ON p.id = t.user_id
+  WHERE t.household_id = p_household_id
+    AND (t.search_vector @@ plainto_tsquery('simple', query) OR query <% t.description)
+  ORDER BY rank DESC, t.date DESC
+  LIMIT page_size OFFSET page_offset;
+$$;
+
+DROP FUNCTION IF EXISTS public.monthly_totals(DATE, DATE);
+CREATE OR REPLACE FUNCTION public.monthly_totals(p_household_id UUID, start_date DATE, end_date DATE)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT coalesce(jsonb_agg(row_to_json(m) ORDER BY m.month), '[]'::jsonb)
+  FROM (
+    SELECT date_trunc('month', t.date)::date AS month,
+           t.category_id,
+           t.user_id,
+           coalesce(t.is_annie_related, FALSE) AS is_annie_related,
+           SUM(t.amount) AS total,
+           COUNT(*) AS tx_count
+    FROM public.transactions t
+    WHERE t.household_id = p_household_id
+      AND t.date >= start_date AND t.date < end_date
+    GROUP BY 1, 2, 3, 4
+  ) m;
+$$;
+
+-- 10. Recurring Transactions: Templates materialized by a scheduled generator
+CREATE TABLE public.recurring_transactions (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  user_id UUID REFERENCES public.profiles(id),
+  category_id UUID REFERENCES public.categories(id) ON DELETE SET NULL,
+  amount NUMERIC(15,2) NOT NULL,
+  description TEXT NOT NULL,
+  is_annie_related BOOLEAN DEFAULT FALSE,
+  schedule TEXT NOT NULL,  -- cron expression; only day-of-month, month and day-of-week are used
+  start_date DATE NOT NULL DEFAULT CURRENT_DATE,
+  end_date DATE,
+  last_generated_date DATE,
+  active BOOLEAN DEFAULT TRUE,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX recurring_transactions_household_idx ON public.recurring_transactions (household_id, active);
+
+-- One occurrence per template per date makes generation idempotent
+ALTER TABLE public.transactions
+  ADD COLUMN recurring_id UUID REFERENCES public.recurring_transactions(id) ON DELETE SET NULL;
+ALTER TABLE public.transactions
+  ADD CONSTRAINT transactions_recurring_date_key UNIQUE (recurring_id, date);
+
+CREATE INDEX categories_household_fixed_idx ON public.categories (household_id, is_fixed);
+
+-- Fixed vs variable spending for a period, resolved through the indexes above
+CREATE OR REPLACE FUNCTION public.fixed_variable_spending(p_household_id UUID, start_date DATE, end_date DATE)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'fixed', coalesce(SUM(t.amount) FILTER (WHERE c.is_fixed), 0),
+    'variable', coalesce(SUM(t.amount) FILTER (WHERE c.is_fixed IS NOT TRUE), 0)
+  )
+  FROM public.transactions t
+  LEFT JOIN public.categories c ON c.id = t.category_id
+  WHERE t.household_id = p_household_id
+    AND t.date >= start_date AND t.date < end_date;
+$$;
+
+-- 11. Budget Alerts: 80%/100% envelope crossings recorded at write time
+-- Running totals per category and month, kept current by the trigger below so
+-- each write compares old and new totals in O(1) instead of rescanning the month
+CREATE TABLE public.category_month_totals (
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  category_id UUID NOT NULL REFERENCES public.categories(id) ON DELETE CASCADE,
+  month DATE NOT NULL,  -- first day of the month
+  total NUMERIC(15,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (category_id, month)
+);
+
+INSERT INTO public.category_month_totals (household_id, category_id, month, total)
+SELECT household_id, category_id, date_trunc('month', date)::date, SUM(amount)
+FROM public.transactions
+WHERE category_id IS NOT NULL
+GROUP BY household_id, category_id, date_trunc('month', date);
+
+CREATE TABLE public.budget_alerts (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  category_id UUID NOT NULL REFERENCES public.categories(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  threshold NUMERIC(3,2) NOT NULL,  -- 0.80 or 1.00 of monthly_budget
+  direction TEXT NOT NULL CHECK (direction IN ('up', 'down')),
+  total NUMERIC(15,2) NOT NULL,
+  budget NUMERIC(15,2) NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX budget_alerts_household_created_idx ON public.budget_alerts (household_id, created_at DESC);
+
+ALTER TABLE public.profiles ADD COLUMN alerts_seen_at TIMESTAMPTZ;
+
+-- Apply one write's delta to a category-month total and record any threshold
+-- it crosses. The upsert row lock serializes concurrent writers per envelope.
+CREATE OR REPLACE FUNCTION public.apply_budget_delta(p_household_id UUID, p_category_id UUID, p_date DATE, p_delta NUMERIC)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+DECLARE
+  v_month DATE := date_trunc('month', p_date)::date;
+  v_new NUMERIC;
+  v_old NUMERIC;
+  v_budget NUMERIC;
+  v_threshold NUMERIC;
+BEGIN
+  IF p_category_id IS NULL OR p_delta = 0 THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO category_month_totals (household_id, category_id, month, total)
+  VALUES (p_household_id, p_category_id, v_month, p_delta)
+  ON CONFLICT (category_id, month) DO UPDATE SET total = category_month_totals.total + EXCLUDED.total
+  RETURNING total INTO v_new;
+  v_old := v_new - p_delta;
+
+  SELECT monthly_budget INTO v_budget FROM categories WHERE id = p_category_id;
+  IF coalesce(v_budget, 0) <= 0 THEN
+    RETURN;
+  END IF;
+
+  FOREACH v_threshold IN ARRAY ARRAY[0.80, 1.00] LOOP
+    IF v_old < v_threshold * v_budget AND v_new >= v_threshold * v_budget THEN
+      INSERT INTO budget_alerts (household_id, category_id, month, threshold, direction, total, budget)
+      VALUES (p_household_id, p_category_id, v_month, v_threshold, 'up', v_new, v_budget);
+    ELSIF v_old >= v_threshold * v_budget AND v_new < v_threshold * v_budget THEN
+      INSERT INTO budget_alerts (household_id, category_id, month, threshold, direction, total, budget)
+      VALUES (p_household_id, p_category_id, v_month, v_threshold, 'down', v_new, v_budget);
+    END IF;
+  END LOOP;
+END;
+$$;
+
+-- Runs inside every transaction write (single adds, edits, deletes, bulk and
+-- recurring inserts); an edit within the same envelope applies one net delta
+CREATE OR REPLACE FUNCTION public.transactions_budget_alerts()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND OLD.category_id IS NOT DISTINCT FROM NEW.category_id
+     AND date_trunc('month', OLD.date) = date_trunc('month', NEW.date) THEN
+    PERFORM apply_budget_delta(NEW.household_id, NEW.category_id, NEW.date, NEW.amount - OLD.amount);
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM apply_budget_delta(OLD.household_id, OLD.category_id, OLD.date, -OLD.amount);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM apply_budget_delta(NEW.household_id, NEW.category_id, NEW.date, NEW.amount);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER transactions_budget_alerts
+  AFTER INSERT OR DELETE OR UPDATE OF amount, category_id, date ON public.transactions
+  FOR EACH ROW EXECUTE FUNCTION public.transactions_budget_alerts();
+
+-- 12. Archive: Closed years moved out of the hot transactions table
+-- One compressed row per household-month holds the archived detail; summaries
+-- at monthly_totals granularity stay queryable for budget and trend views.
+CREATE TABLE public.transactions_archive (
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  month DATE NOT NULL,  -- first day of the month
+  row_count INTEGER NOT NULL,
+  total NUMERIC(15,2) NOT NULL,
+  rows JSONB NOT NULL,  -- transactions rows as written, oldest first
+  archived_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (household_id, month)
+);
+ALTER TABLE public.transactions_archive ALTER COLUMN rows SET COMPRESSION lz4;
+
+-- No foreign keys: summaries outlive deleted categories and profiles, which
+-- then chart as "Other" like unlinked transactions do
+CREATE TABLE public.transaction_summaries (
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  category_id UUID,
+  user_id UUID,
+  is_annie_related BOOLEAN NOT NULL,
+  total NUMERIC(15,2) NOT NULL,
+  tx_count INTEGER NOT NULL,
+  CONSTRAINT transaction_summaries_key
+    UNIQUE NULLS NOT DISTINCT (household_id, month, category_id, user_id, is_annie_related)
+);
+
+-- Archived descriptions stay searchable: one slim row per archived transaction,
+-- indexed like the hot table (the JSONB detail itself isn't searchable)
+CREATE TABLE public.transactions_archive_search (
+  household_id UUID NOT NULL REFERENCES public.households(id) ON DELETE CASCADE,
+  id UUID NOT NULL,
+  date DATE NOT NULL,
+  amount NUMERIC(15,2) NOT NULL,
+  description TEXT,
+  is_annie_related BOOLEAN,
+  category_id UUID,
+  user_id UUID,
+  search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(description, ''))) STORED,
+  PRIMARY KEY (household_id, id)
+);
+CREATE INDEX transactions_archive_search_vector_idx ON public.transactions_archive_search
+  USING GIN (household_id, search_vector);
+CREATE INDEX transactions_archive_search_trgm_idx ON public.transactions_archive_search
+  USING GIN (household_id, description gin_trgm_ops);
+
+-- Archiving and restoring move rows without changing any envelope's total
+CREATE OR REPLACE FUNCTION public.transactions_budget_alerts()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+BEGIN
+  IF current_setting('app.archiving', true) = 'on' THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'UPDATE'
+     AND OLD.category_id IS NOT DISTINCT FROM NEW.category_id
+     AND date_trunc('month', OLD.date) = date_trunc('month', NEW.date) THEN
+    PERFORM apply_budget_delta(NEW.household_id, NEW.category_id, NEW.date, NEW.amount - OLD.amount);
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM apply_budget_delta(OLD.household_id, OLD.category_id, OLD.date, -OLD.amount);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM apply_budget_delta(NEW.household_id, NEW.category_id, NEW.date, NEW.amount);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Move a closed year into the archive in one database transaction. Rows added
+-- to an already archived year later are merged in by re-running it.
+CREATE OR REPLACE FUNCTION public.archive_year(p_household_id UUID, p_year INTEGER)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_start DATE := make_date(p_year, 1, 1);
+  v_end DATE := make_date(p_year + 1, 1, 1);
+  v_count INTEGER;
+  v_total NUMERIC;
+  v_deleted INTEGER;
+BEGIN
+  IF p_year >= extract(year FROM current_date) THEN
+    RAISE EXCEPTION 'Year % is not closed yet', p_year;
+  END IF;
+  PERFORM set_config('app.archiving', 'on', true);
+
+  SELECT count(*), coalesce(SUM(amount), 0) INTO v_count, v_total
+  FROM transactions
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end;
+  IF v_count = 0 THEN
+    RETURN jsonb_build_object('year', p_year, 'rows', 0, 'total', 0);
+  END IF;
+
+  INSERT INTO transaction_summaries (household_id, month, category_id, user_id, is_annie_related, total, tx_count)
+  SELECT household_id, date_trunc('month', date)::date, category_id, user_id,
+         coalesce(is_annie_related, FALSE), SUM(amount), count(*)
+  FROM transactions
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end
+  GROUP BY 1, 2, 3, 4, 5
+  ON CONFLICT ON CONSTRAINT transaction_summaries_key DO UPDATE
+    SET total = transaction_summaries.total + EXCLUDED.total,
+        tx_count = transaction_summaries.tx_count + EXCLUDED.tx_count;
+
+  INSERT INTO transactions_archive (household_id, month, row_count, total, rows)
+  SELECT household_id, date_trunc('month', date)::date, count(*), SUM(amount),
+         jsonb_agg(to_jsonb(t) - 'search_vector' ORDER BY date, created_at)
+  FROM transactions t
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end
+  GROUP BY 1, 2
+  ON CONFLICT (household_id, month) DO UPDATE
+    SET row_count = transactions_archive.row_count + EXCLUDED.row_count,
+        total = transactions_archive.total + EXCLUDED.total,
+        rows = transactions_archive.rows || EXCLUDED.rows,
+        archived_at = NOW();
+
+  INSERT INTO transactions_archive_search (household_id, id, date, amount, description,
+                                           is_annie_related, category_id, user_id)
+  SELECT household_id, id, date, amount, description, is_annie_related, category_id, user_id
+  FROM transactions
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end
+  ON CONFLICT (household_id, id) DO NOTHING;
+
+  DELETE FROM transactions
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  IF v_deleted <> v_count THEN
+    RAISE EXCEPTION 'Archived % rows but deleted %', v_count, v_deleted;
+  END IF;
+
+  RETURN jsonb_build_object('year', p_year, 'rows', v_count, 'total', v_total);
+END;
+$$;
+
+-- Move an archived year back into transactions (the inverse of archive_year)
+CREATE OR REPLACE FUNCTION public.restore_year(p_household_id UUID, p_year INTEGER)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_start DATE := make_date(p_year, 1, 1);
+  v_end DATE := make_date(p_year + 1, 1, 1);
+  v_count INTEGER;
+BEGIN
+  PERFORM set_config('app.archiving', 'on', true);
+
+  -- Categories, templates and members deleted since archiving are unlinked, as they would have been
+  INSERT INTO transactions (id, household_id, user_id, category_id, amount, description,
+                            is_annie_related, date, created_at, recurring_id)
+  SELECT r.id, r.household_id,
+         (SELECT p.id FROM profiles p WHERE p.id = r.user_id),
+         (SELECT c.id FROM categories c WHERE c.id = r.category_id),
+         r.amount, r.description, r.is_annie_related, r.date, r.created_at,
+         (SELECT rt.id FROM recurring_transactions rt WHERE rt.id = r.recurring_id)
+  FROM transactions_archive a,
+       jsonb_populate_recordset(NULL::transactions, a.rows) r
+  WHERE a.household_id = p_household_id AND a.month >= v_start AND a.month < v_end;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  DELETE FROM transactions_archive
+  WHERE household_id = p_household_id AND month >= v_start AND month < v_end;
+  DELETE FROM transaction_summaries
+  WHERE household_id = p_household_id AND month >= v_start AND month < v_end;
+  DELETE FROM transactions_archive_search
+  WHERE household_id = p_household_id AND date >= v_start AND date < v_end;
+
+  RETURN jsonb_build_object('year', p_year, 'rows', v_count);
+END;
+$$;
+
+-- Check every archived month of a year: stored counts and totals against the
+-- archived rows, and against the summaries the views read
+CREATE OR REPLACE FUNCTION public.verify_archive(p_household_id UUID, p_year INTEGER)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  WITH archived AS (
+    SELECT a.month, a.row_count, a.total,
+           jsonb_array_length(a.rows) AS detail_count,
+           (SELECT coalesce(SUM((r->>'amount')::numeric), 0) FROM jsonb_array_elements(a.rows) r) AS detail_total
+    FROM public.transactions_archive a
+    WHERE a.household_id = p_household_id
+      AND a.month >= make_date(p_year, 1, 1) AND a.month < make_date(p_year + 1, 1, 1)
+  ), summarized AS (
+    SELECT s.month, SUM(s.tx_count) AS tx_count, SUM(s.total) AS total
+    FROM public.transaction_summaries s
+    WHERE s.household_id = p_household_id
+      AND s.month >= make_date(p_year, 1, 1) AND s.month < make_date(p_year + 1, 1, 1)
+    GROUP BY s.month
+  ), checked AS (
+    SELECT coalesce(a.month, s.month) AS month,
+           a.row_count, a.total, a.detail_count, a.detail_total,
+           s.tx_count AS summary_count, s.total AS summary_total,
+           a.row_count = a.detail_count AND a.total = a.detail_total
+             AND a.row_count = s.tx_count AND a.total = s.total AS ok
+    FROM archived a
+    FULL JOIN summarized s ON s.month = a.month
+  )
+  SELECT jsonb_build_object(
+    'year', p_year,
+    'months', count(*),
+    'rows', coalesce(SUM(row_count), 0),
+    'total', coalesce(SUM(total), 0),
+    'ok', coalesce(bool_and(coalesce(ok, FALSE)), TRUE),
+    'mismatches', coalesce(jsonb_agg(row_to_json(checked)) FILTER (WHERE ok IS NOT TRUE), '[]'::jsonb)
+  )
+  FROM checked;
+$$;
+
+-- Read-through: archived detail for a period, shaped like the hot table query
+-- "*, categories(name), profiles(display_name)"
+CREATE OR REPLACE FUNCTION public.archived_transactions(p_household_id UUID, start_date DATE, end_date DATE)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT coalesce(jsonb_agg(
+           r || jsonb_build_object(
+             'categories', CASE WHEN c.id IS NULL THEN NULL ELSE jsonb_build_object('name', c.name) END,
+             'profiles', CASE WHEN p.id IS NULL THEN NULL ELSE jsonb_build_object('display_name', p.display_name) END,
+             'archived', TRUE
+           ) ORDER BY r->>'date' DESC), '[]'::jsonb)
+  FROM public.transactions_archive a
+  CROSS JOIN jsonb_array_elements(a.rows) r
+  LEFT JOIN public.categories c ON c.id = (r->>'category_id')::uuid
+  LEFT JOIN public.profiles p ON p.id = (r->>'user_id')::uuid
+  WHERE a.household_id = p_household_id
+    AND a.month >= date_trunc('month', start_date) AND a.month < end_date
+    AND (r->>'date')::date >= start_date AND (r->>'date')::date < end_date;
+$$;
+
+-- Search reads through to archived years via the slim search table
+CREATE OR REPLACE FUNCTION public.search_transactions(
+  p_household_id UUID,
+  query TEXT,
+  page_size INTEGER DEFAULT 20,
+  page_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+  id UUID,
+  date DATE,
+  amount NUMERIC,
+  description TEXT,
+  is_annie_related BOOLEAN,
+  category_name TEXT,
+  display_name TEXT,
+  rank REAL,
+  total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+  WITH matches AS (
+    SELECT t.id, t.date, t.amount, t.description, t.is_annie_related, t.category_id, t.user_id, t.search_vector
+    FROM public.transactions t
+    WHERE t.household_id = p_household_id
+      AND (t.search_vector @@ plainto_tsquery('simple', query) OR query <% t.description)
+    UNION ALL
+    SELECT a.id, a.date, a.amount, a.description, a.is_annie_related, a.category_id, a.user_id, a.search_vector
+    FROM public.transactions_archive_search a
+    WHERE a.household_id = p_household_id
+      AND (a.search_vector @@ plainto_tsquery('simple', query) OR query <% a.description)
+  )
+  SELECT m.id, m.date, m.amount, m.description, m.is_annie_related,
+         c.name, p.display_name,
+         GREATEST(ts_rank(m.search_vector, plainto_tsquery('simple', query)),
+                  word_similarity(query, m.description)) AS rank,
+         (SELECT count(*) FROM (SELECT 1 FROM matches LIMIT 1000) capped) AS total_count
+  FROM matches m
+  LEFT JOIN public.categories c ON c.id = m.category_id
+  LEFT JOIN public.profiles p ON p.id = m.user_id
+  ORDER BY rank DESC, m.date DESC
+  LIMIT page_size OFFSET page_offset;
+$$;
+
+-- Trends read archived months from the summaries
+CREATE OR REPLACE FUNCTION public.monthly_totals(p_household_id UUID, start_date DATE, end_date DATE)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+  SELECT coalesce(jsonb_agg(row_to_json(m) ORDER BY m.month), '[]'::jsonb)
+  FROM (
+    SELECT month, category_id, user_id, is_annie_related, SUM(total) AS total, SUM(tx_count) AS tx_count
+    FROM (
+      SELECT date_trunc('month', t.date)::date AS month,
+             t.category_id,
+             t.user_id,
+             coalesce(t.is_annie_related, FALSE) AS is_annie_related,
+             t.amount AS total,
+             1 AS tx_count
+      FROM public.transactions t
+      WHERE t.household_id = p_household_id
+        AND t.date >= start_date AND t.date < end_date
+      UNION ALL
+      SELECT s.month, s.category_id, s.user_id, s.is_annie_related, s.total, s.tx_count
+      FROM public.transaction_summaries s
+      WHERE s.household_id = p_household_id
+        AND s.month >= start_date AND s.month < end_date
+    ) u
+    GROUP BY 1, 2, 3, 4
+  ) m;
+$$;
+
+-- 13. Change Tracking: Edits and deletes for incremental readers
+-- created_at doesn't move on edits and deleted rows leave nothing behind, so
+-- readers that copy transactions (the analytics snapshots) follow updated_at
+-- and the deletes log instead of re-reading everything
+ALTER TABLE public.transactions ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE INDEX transactions_household_updated_idx ON public.transactions (household_id, updated_at, id);
+
+CREATE OR REPLACE FUNCTION public.touch_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at := NOW();
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER transactions_touch_updated_at
+  BEFORE UPDATE ON public.transactions
+  FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+-- No foreign key: entries must outlive the household delete that cascades to
+-- its transactions. Rows moved by archive_year are logged as archived, not
+-- deleted. Entries older than 30 days are purged by the analytics sync.
+CREATE TABLE public.transaction_deletes (
+  household_id UUID NOT NULL,
+  id UUID NOT NULL,
+  archived BOOLEAN NOT NULL DEFAULT FALSE,
+  deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX transaction_deletes_household_idx ON public.transaction_deletes (household_id, deleted_at);
+CREATE INDEX transaction_deletes_deleted_at_idx ON public.transaction_deletes (deleted_at);
+
+CREATE OR REPLACE FUNCTION public.log_transaction_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO transaction_deletes (household_id, id, archived)
+  VALUES (OLD.household_id, OLD.id, coalesce(current_setting('app.archiving', true) = 'on', FALSE));
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER transactions_log_delete
+  AFTER DELETE ON public.transactions
+  FOR EACH ROW EXECUTE FUNCTION public.log_transaction_delete();
@@ -0,0 +1,163 @@
+"""Measure the work fragment-scoped reruns save per interaction.
+
+Performs each interaction with AppTest against the load test's in-memory
+backend in two trees: a baseline revision, checked out into a temporary git
+worktree, and the working tree. Each tree runs in its own interpreter.
+
+"Before" is the whole rerun the interaction costs in the baseline, where
+every click reruns the page. "After" is the cost of the fragment the
+interaction reruns in the working tree, attributed by wrapping the fragment
+function: AppTest may still rerun the whole page, but under the server only
+the fragment's share runs. Each interaction is repeated and reported once.
+
+Usage: python scripts/bench_fragments.py --baseline REV [--backend-ms 20] [--repeats 5]
+
+REV is the last revision before the fragment change.
+"""
+import argparse
+import functools
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from load_test import ROOT, FakeBackend, FakeSupabase, FakeModel, Session, install_stubs
+
+ADD_PAGE = "pages/0_Add_Transaction.py"
+MONTHLY_PAGE = "pages/1_Monthly_Transactions.py"
+
+SECTIONS = defaultdict(list)
+
+# Transaction the row interactions click on; only its card's reruns are attributed
+TARGET = {}
+
+# (module, function, section label, which calls to attribute)
+FRAGMENTS = [
+    ("components", "render_smart_input", "smart input", None),
+    ("components.transaction_list", "_render_transaction", "transaction row",
+     lambda *args: args[2]["id"] == TARGET.get("id")),
+]
+
+
+def instrument(module, name: str, label: str, backend: FakeBackend, match=None):
+    """Wrap module.name so each matching call records (queries, ms) under label."""
+    func = getattr(module, name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if match and not match(*args):
+            return func(*args, **kwargs)
+        queries, start = backend.queries, time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            SECTIONS[label].append((backend.queries - queries, (time.perf_counter() - start) * 1000))
+
+    setattr(module, name, wrapper)
+
+
+def timed(backend: FakeBackend, action, label: str):
+    """Run one interaction; return its full cost and its fragment's share."""
+    SECTIONS.clear()
+    queries, start = backend.queries, time.perf_counter()
+    action()
+    full = (backend.queries - queries, (time.perf_counter() - start) * 1000)
+    calls = SECTIONS.get(label)
+    section = (sum(q for q, _ in calls), sum(ms for _, ms in calls)) if calls else None
+    return full, section
+
+
+def summarize(samples: list):
+    """Mean queries and median ms over repeats."""
+    return [statistics.mean(q for q, _ in samples), statistics.median(ms for _, ms in samples)]
+
+
+def measure(root: str, backend_ms: float, repeats: int) -> dict:
+    """Drive every interaction against the tree at root and return its costs."""
+    sys.path.insert(0, root)
+    backend = FakeBackend()
+    backend.seed(2)
+    install_stubs(FakeSupabase(backend, backend_ms), FakeModel(0))
+
+    for module_name, name, label, match in FRAGMENTS:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue  # the baseline predates the module
+        instrument(module, name, label, backend, match)
+
+    session = Session(0, root)
+    session.login()
+    at = session.at
+    samples = defaultdict(lambda: {"full": [], "section": []})
+
+    def record(interaction, label, action):
+        full, section = timed(backend, action, label)
+        samples[interaction]["full"].append(full)
+        if section:
+            samples[interaction]["section"].append(section)
+
+    at.switch_page(ADD_PAGE).run()
+    for i in range(repeats):
+        session._widget(at.text_input, "Type naturally").input(f"coffee {50 + i}k")
+        record("Go (smart input)", "smart input", session._button("Go").click().run)
+
+    at.switch_page(MONTHLY_PAGE).run()
+    TARGET["id"] = next(b.key for b in at.button if (b.key or "").startswith("delete_"))[len("delete_"):]
+    for _ in range(repeats):
+        record("Delete on a row", "transaction row", at.button(key=f"delete_{TARGET['id']}").click().run)
+        record("Cancel delete on a row", "transaction row", at.button(key=f"cancel_{TARGET['id']}").click().run)
+
+    return {
+        interaction: {kind: summarize(values) if values else None for kind, values in costs.items()}
+        for interaction, costs in samples.items()
+    }
+
+
+def measure_tree(root: str, args) -> dict:
+    """Measure a tree in a fresh interpreter, so the two trees' modules never mix."""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", root,
+         "--backend-ms", str(args.backend_ms), "--repeats", str(args.repeats)],
+        check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="git revision before the fragment change")
+    parser.add_argument("--backend-ms", type=float, default=20, help="simulated Supabase latency per query")
+    parser.add_argument("--repeats", type=int, default=5, help="times each interaction is performed")
+    parser.add_argument("--measure", metavar="ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.backend_ms, args.repeats)))
+        return
+    if not args.baseline:
+        parser.error("--baseline is required")
+
+    worktree = tempfile.mkdtemp(prefix="bench_fragments_")
+    subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", worktree, args.baseline], check=True)
+    try:
+        before = measure_tree(worktree, args)
+        after = measure_tree(ROOT, args)
+    finally:
+        subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", worktree], check=True)
+
+    print(f"{'interaction':<26} {'before q':>8} {'before ms':>10} {'after q':>8} {'after ms':>9} {'saved':>6}")
+    for interaction, costs in after.items():
+        full_q, full_ms = before[interaction]["full"]
+        frag_q, frag_ms = costs["section"] or costs["full"]
+        saved = 1 - frag_ms / full_ms if full_ms else 0
+        print(f"{interaction:<26} {full_q:>8.1f} {full_ms:>10.1f} {frag_q:>8.1f} {frag_ms:>9.1f} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+-- Per-household query cost vs. number of households.
+--
+-- Run against a scratch database that has schema.sql applied:
+--   psql "$SCRATCH_DATABASE_URL" -f scripts/bench_households.sql
+--
+-- For each tenant count it loads synthetic households (10 categories and
+-- ~2,000 transactions each, spread over two years), then times the
+-- month-view and month-spending queries for one household. With indexes
+-- leading on household_id the timings should stay flat as tenants grow.
+-- Everything runs in one transaction that is rolled back at the end.
+
+BEGIN;
+
+-- Benchmark rows bypass the auth.users foreign key
+ALTER TABLE public.transactions DROP CONSTRAINT IF EXISTS transactions_user_id_fkey;
+
+CREATE TEMP TABLE bench_results (households INTEGER, query TEXT, avg_ms NUMERIC);
+
+DO $$
+DECLARE
+  tenant_counts INTEGER[] := ARRAY[10, 100, 1000];
+  loaded INTEGER := 0;
+  target INTEGER;
+  probe UUID;
+  started TIMESTAMPTZ;
+  runs INTEGER := 20;
+  i INTEGER;
+BEGIN
+  FOREACH target IN ARRAY tenant_counts LOOP
+    -- Grow the tenant set to the target size
+    WITH new_households AS (
+      INSERT INTO public.households (name)
+      SELECT 'bench ' || g FROM generate_series(loaded + 1, target) g
+      RETURNING id
+    ), new_categories AS (
+      INSERT INTO public.categories (household_id, name, monthly_budget)
+      SELECT h.id, 'cat ' || c, 1000000 FROM new_households h, generate_series(1, 10) c
+      RETURNING id, household_id
+    )
+    INSERT INTO public.transactions (household_id, category_id, user_id, amount, description, date)
+    SELECT c.household_id, c.id, c.household_id, (random() * 500000)::NUMERIC(15,2),
+           'bench item ' || g, DATE '2024-01-01' + (random() * 730)::INTEGER
+    FROM new_categories c, generate_series(1, 200) g;
+    loaded := target;
+    ANALYZE public.transactions;
+
+    SELECT id INTO probe FROM public.households WHERE name = 'bench 1';
+
+    started := clock_timestamp();
+    FOR i IN 1..runs LOOP
+      PERFORM t.*, c.name
+      FROM public.transactions t LEFT JOIN public.categories c ON c.id = t.category_id
+      WHERE t.household_id = probe AND t.date >= DATE '2025-06-01' AND t.date < DATE '2025-07-01'
+      ORDER BY t.date DESC;
+    END LOOP;
+    INSERT INTO bench_results VALUES (target, 'monthly transactions',
+      round(extract(epoch FROM clock_timestamp() - started) * 1000 / runs, 3));
+
+    started := clock_timestamp();
+    FOR i IN 1..runs LOOP
+      PERFORM category_id, SUM(amount)
+      FROM public.transactions
+      WHERE household_id = probe AND date >= DATE '2025-06-01' AND date < DATE '2025-07-01'
+      GROUP BY category_id;
+    END LOOP;
+    INSERT INTO bench_results VALUES (target, 'monthly spending',
+      round(extract(epoch FROM clock_timestamp() - started) * 1000 / runs, 3));
+
+    started := clock_timestamp();
+    FOR i IN 1..runs LOOP
+      PERFORM public.monthly_totals(probe, DATE '2024-01-01', DATE '2026-01-01');
+    END LOOP;
+    INSERT INTO bench_results VALUES (target, 'monthly_totals (2 years)',
+      round(extract(epoch FROM clock_timestamp() - started) * 1000 / runs, 3));
+  END LOOP;
+END $$;
+
+SELECT query, households, avg_ms FROM bench_results ORDER BY query, households;
+
+ROLLBACK;
@@ -0,0 +1,102 @@
+"""Memory and CPU benchmark: MonthLedger vs the list-of-dicts month representation.
+
+Builds a synthetic month shaped like get_monthly_transactions() output and times
+the operations the pages perform: category/user filters, totals and per-category
+group-bys.
+
+Usage: python scripts/bench_ledger.py [--rows N] [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import MonthLedger  # noqa: E402
+
+CATEGORIES = ["Groceries", "Dining", "Transport", "Utilities", "Health",
+              "Education", "Entertainment", "Shopping", "Hobbies", "Other"]
+USERS = ["Thanh", "Happy"]
+
+
+def make_rows(n: int):
+    """Synthetic month of transactions with joined category and profile names."""
+    rng = random.Random(42)
+    categories = {name: str(uuid.uuid4()) for name in CATEGORIES}
+    users = {name: str(uuid.uuid4()) for name in USERS}
+    rows = []
+    for _ in range(n):
+        category = rng.choice(CATEGORIES)
+        user = rng.choice(USERS)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "user_id": users[user],
+            "category_id": categories[category],
+            "amount": f"{rng.randint(10, 5000) * 1000}.00",
+            "description": f"{category.lower()} purchase",
+            "is_annie_related": rng.random() < 0.2,
+            "date": f"2024-05-{rng.randint(1, 31):02d}",
+            "created_at": "2024-05-01T00:00:00+00:00",
+            "categories": {"name": category},
+            "profiles": {"display_name": user},
+        })
+    return rows
+
+
+def dict_workload(rows):
+    filtered = [tx for tx in rows if tx.get("categories") and tx["categories"].get("name") == "Dining"]
+    filtered = [tx for tx in filtered if tx.get("profiles") and tx["profiles"].get("display_name") == "Happy"]
+    total = sum(float(tx["amount"]) for tx in filtered)
+    spending = {}
+    for tx in rows:
+        cat_id = tx.get("category_id")
+        if cat_id:
+            spending[cat_id] = spending.get(cat_id, 0) + float(tx["amount"])
+    return total, spending
+
+
+def ledger_workload(ledger):
+    filtered = ledger.filter(ledger.mask_category("Dining"))
+    filtered = filtered.filter(filtered.mask_user("Happy"))
+    return filtered.total(), ledger.spending_by_category()
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows, dict_bytes = measure_memory(lambda: make_rows(args.rows))
+    # Build from fresh rows so the ledger is charged for the strings it keeps alive
+    ledger, ledger_bytes = measure_memory(lambda: MonthLedger.from_transactions(make_rows(args.rows)))
+
+    dict_result = dict_workload(rows)
+    ledger_result = ledger_workload(ledger)
+    assert abs(dict_result[0] - ledger_result[0]) < 0.01, "totals differ"
+
+    build_s = min(timeit.repeat(lambda: MonthLedger.from_transactions(rows), number=1, repeat=5))
+    dict_s = min(timeit.repeat(lambda: dict_workload(rows), number=1, repeat=args.repeat))
+    ledger_s = min(timeit.repeat(lambda: ledger_workload(ledger), number=1, repeat=args.repeat))
+
+    print(f"rows: {args.rows:,}")
+    print(f"{'':<14} {'memory':>12} {'workload':>12}")
+    print(f"{'list of dicts':<14} {dict_bytes / 1024:>10,.0f}KB {dict_s * 1000:>10.2f}ms")
+    print(f"{'MonthLedger':<14} {ledger_bytes / 1024:>10,.0f}KB {ledger_s * 1000:>10.2f}ms")
+    print(f"ledger build (one-off per fetch): {build_s * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Offline accuracy, latency and cost benchmark for the NLP parser.
+
+Replays scripts/parser_corpus.jsonl, a labelled corpus of realistic entries
+(dong amounts with k/M/tr suffixes, relative dates, Annie flags and category
+commands), through parse_input with a model stub that returns each entry's
+recorded response. Prompt, normalization and parser changes can then be
+checked for field-level accuracy, latency and cost per entry without network
+access.
+
+Recorded responses store dates as {today}/{today-N} placeholders and categories
+by name, so they replay against any date and category order. Token counts are
+estimated from the actual prompt and response text (about 4 characters per
+token), so prompt changes show up in the cost column. Reported latency is the
+parser's own time plus the recorded model latency.
+
+Responses marked "synthetic" were seeded from the labels, not captured from
+Gemini, so they say nothing about model accuracy or latency. Accuracy and the
+latency distribution are reported over recorded responses only; synthetic ones
+are replayed as a pipeline check (normalization, date and category mapping).
+Run --record with a Gemini key to replace them.
+
+--live skips the recordings and sends every entry to the live model instead,
+scoring all of them and reporting real latency (excluding rate-limit waits)
+and real token cost. Both --live and --record read the Gemini key from
+.streamlit/secrets.toml, so run them from the repository root.
+
+Usage: python scripts/bench_parser.py [--parser module:function ...] [--errors]
+       python scripts/bench_parser.py --live     # score against Gemini directly
+       python scripts/bench_parser.py --record   # refresh responses from Gemini
+"""
+import argparse
+import importlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CORPUS_PATH = os.path.join(ROOT, "scripts", "parser_corpus.jsonl")
+CATEGORIES = ["Groceries", "Dining", "Transport", "Utilities", "Health", "Education",
+              "Entertainment", "Shopping", "Hobbies", "Other"]
+EXPENSE_FIELDS = ["type", "amount", "category", "is_annie_related", "date"]
+CATEGORY_FIELDS = ["type", "action", "name", "budget"]
+CHARS_PER_TOKEN = 4
+DATE_PLACEHOLDER = re.compile(r"\{today([+-]\d+)?\}")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def resolve_date(value, today: date):
+    """Turn "today", "today-1" or a "{today-1}" placeholder into an ISO date."""
+    if not isinstance(value, str):
+        return value
+    match = DATE_PLACEHOLDER.fullmatch(value) or re.fullmatch(r"today([+-]\d+)?", value)
+    if not match:
+        return value
+    return (today + timedelta(days=int(match.group(1) or 0))).isoformat()
+
+
+def _prompt_line(prompt: str, prefix: str) -> str:
+    for line in prompt.splitlines():
+        if line.startswith(prefix):
+            return line[len(prefix):]
+    return ""
+
+
+class RecordedModel:
+    """Model stub answering each corpus input with its recorded response."""
+
+    def __init__(self, corpus: list):
+        from nlp_parser import MAX_INPUT_CHARS
+
+        self.responses = {entry["input"][:MAX_INPUT_CHARS]: entry["response"] for entry in corpus}
+        self.model_ms = 0.0
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        user_input = _prompt_line(prompt, "Input: ")
+        if user_input not in self.responses:
+            raise KeyError(f"No recorded response for {user_input!r}")
+        recorded = self.responses[user_input]
+        self.model_ms += recorded.get("latency_ms", 0.0)
+
+        today = date.fromisoformat(_prompt_line(prompt, "Today: "))
+        response = dict(recorded["json"])
+        response["date"] = resolve_date(response.get("date"), today)
+
+        # Answer with the category code the prompt assigned to the recorded name
+        codes = dict(pair.split("=", 1)[::-1] for pair in
+                     _prompt_line(prompt, "Category codes (null if none fit): ").split(",") if "=" in pair)
+        if response.get("category") is not None:
+            response["category"] = codes.get(response["category"])
+
+        text = json.dumps(response, ensure_ascii=False)
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(
+            prompt_token_count=len(prompt) // CHARS_PER_TOKEN,
+            candidates_token_count=len(text) // CHARS_PER_TOKEN,
+        ))
+
+
+def load_parser(spec: str):
+    """Import a parser given as module:function (signature of parse_input)."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "parse_input")
+
+
+def score(entry: dict, result: dict, today: date) -> dict:
+    """Per-field correctness of one parse result."""
+    expected = entry["expected"]
+    fields = EXPENSE_FIELDS if expected["type"] == "expense" else CATEGORY_FIELDS
+    scores = {}
+    for field in fields:
+        want = resolve_date(expected.get(field), today) if field == "date" else expected.get(field)
+        got = result.get(field)
+        if field in ("amount", "budget") and want is not None:
+            scores[field] = got is not None and abs(float(got) - want) < 0.5
+        else:
+            scores[field] = got == want
+    return scores
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def run(parser, corpus: list, show_errors: bool = False, live_model=None) -> dict:
+    """Score parser over the corpus, replaying recordings unless live_model is given."""
+    model = live_model or RecordedModel(corpus)
+    today = date.today()
+    field_hits, field_totals = {}, {}
+    exact, latencies, overheads, costs = 0, [], [], []
+    synthetic, synthetic_ok = 0, 0
+
+    for entry in corpus:
+        model_before = 0.0 if live_model else model.model_ms
+        start = time.perf_counter()
+        result = parser(entry["input"], model, CATEGORIES)
+        elapsed = (time.perf_counter() - start) * 1000
+        usage = result.get("usage") or {}
+        costs.append(usage.get("cost_usd", 0.0))
+
+        scores = score(entry, result, today)
+        is_synthetic = not live_model and entry["response"].get("synthetic")
+        if live_model:
+            # Waiting for quota is not model latency
+            latencies.append(elapsed - usage.get("queue_wait_ms", 0.0))
+        else:
+            overheads.append(elapsed)
+            if not is_synthetic:
+                latencies.append(elapsed + model.model_ms - model_before)
+        if is_synthetic:
+            # Seeded from the labels: only checks the pipeline round-trips them
+            synthetic += 1
+            synthetic_ok += all(scores.values())
+        else:
+            for field, ok in scores.items():
+                field_totals[field] = field_totals.get(field, 0) + 1
+                field_hits[field] = field_hits.get(field, 0) + ok
+            exact += all(scores.values())
+        if show_errors and not all(scores.values()):
+            wrong = {f: result.get(f) for f, ok in scores.items() if not ok}
+            print(f"  {entry['input']!r}: {wrong or result.get('error')}")
+
+    recorded = len(corpus) - synthetic
+    return {
+        "entries": len(corpus),
+        "recorded": recorded,
+        "synthetic": synthetic,
+        "synthetic_ok": synthetic_ok,
+        "exact": exact / recorded if recorded else None,
+        "fields": {f: field_hits[f] / field_totals[f] for f in field_totals},
+        "p50": percentile(latencies, 50) if latencies else None,
+        "p95": percentile(latencies, 95) if latencies else None,
+        "p99": percentile(latencies, 99) if latencies else None,
+        "overhead_ms": statistics.mean(overheads) if overheads else None,
+        "cost_usd": statistics.mean(costs),
+    }
+
+
+def record(corpus: list):
+    """Re-record every response from the live model, in placeholder form."""
+    from nlp_parser import SYSTEM_PROMPT, MAX_INPUT_CHARS
+    from gemini_client import get_gemini_model, build_response_schema
+
+    model = get_gemini_model()
+    today = date.today()
+    codes = [str(i) for i in range(len(CATEGORIES))]
+    hint = "\nCategory codes (null if none fit): " + ",".join(f"{c}={n}" for c, n in zip(codes, CATEGORIES))
+    for entry in corpus:
+        prompt = f"{SYSTEM_PROMPT}{hint}\nToday: {today.isoformat()}\nInput: {entry['input'][:MAX_INPUT_CHARS]}"
+        start = time.perf_counter()
+        response = model.generate_content(prompt, generation_config={"response_schema": build_response_schema(codes)})
+        latency = (time.perf_counter() - start) * 1000
+        parsed = json.loads(response.text)
+        if parsed.get("category") in codes:
+            parsed["category"] = CATEGORIES[int(parsed["category"])]
+        try:
+            offset = (date.fromisoformat(parsed.get("date") or "") - today).days
+            parsed["date"] = "{today" + (f"{offset:+d}" if offset else "") + "}"
+        except ValueError:
+            pass
+        entry["response"] = {"json": parsed, "latency_ms": round(latency, 1)}
+
+    with open(CORPUS_PATH, "w", encoding="utf-8") as f:
+        for entry in corpus:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parser", action="append", help="module:function to benchmark (default nlp_parser:parse_input)")
+    parser.add_argument("--errors", action="store_true", help="print entries with wrong fields")
+    parser.add_argument("--record", action="store_true", help="re-record responses from the live model")
+    parser.add_argument("--live", action="store_true", help="score against the live model instead of the recordings")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if args.record:
+        record(corpus)
+        print(f"Recorded {len(corpus)} responses to {CORPUS_PATH}")
+        return
+
+    import nlp_parser
+    from rate_limit import TokenBucket, SingleFlight
+    live_model = None
+    if args.live:
+        # Live calls keep the configured quota; only coalescing is switched off
+        from gemini_client import get_gemini_model
+        live_model = get_gemini_model()
+    else:
+        # Replay offline: no quota to respect
+        limiter = TokenBucket(rate_per_minute=1_000_000)
+        nlp_parser.get_rate_limiter = lambda: limiter
+    flight = SingleFlight()
+    nlp_parser.get_parse_flight = lambda: flight
+
+    for spec in args.parser or ["nlp_parser:parse_input"]:
+        print(f"{spec} ({'live' if live_model else 'replayed'})")
+        r = run(load_parser(spec), corpus, args.errors, live_model)
+        print(f"  entries {r['entries']}  recorded {r['recorded']}  synthetic {r['synthetic']}")
+        if r["recorded"]:
+            fields = "  ".join(f"{f} {acc:.1%}" for f, acc in r["fields"].items())
+            print(f"  exact {r['exact']:.1%}  {fields}")
+            print(f"  latency p50 {r['p50']:.0f} ms  p95 {r['p95']:.0f} ms  p99 {r['p99']:.0f} ms")
+        else:
+            print("  accuracy and latency not reported: no recorded responses (run --live or --record)")
+        if r["synthetic"]:
+            print(f"  pipeline check {r['synthetic_ok']}/{r['synthetic']} synthetic entries round-trip")
+        if r["overhead_ms"] is None:
+            print(f"  cost ${r['cost_usd']:.7f}/entry")
+        else:
+            print(f"  parser overhead {r['overhead_ms']:.2f} ms  cost ${r['cost_usd']:.7f}/entry (estimated)")
+
+
+if __name__ == "__main__":
+    main()
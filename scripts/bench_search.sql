@@ -0,0 +1,62 @@
+-- Search latency at 1M transactions in one household.
+--
+-- Run against a scratch database that has schema.sql applied:
+--   psql "$SCRATCH_DATABASE_URL" -f scripts/bench_search.sql
+--
+-- Loads one household with 1,000,000 transactions whose descriptions are
+-- drawn from a small vocabulary (so common words match many rows), then
+-- times the first page of search_transactions for exact, prefix, typo and
+-- broad queries. The target is p95 under 100 ms per query.
+-- Everything runs in one transaction that is rolled back at the end.
+
+BEGIN;
+
+-- Benchmark rows bypass the auth.users foreign key
+ALTER TABLE public.transactions DROP CONSTRAINT IF EXISTS transactions_user_id_fkey;
+
+CREATE TEMP TABLE bench_timings (query TEXT, ms NUMERIC);
+
+DO $$
+DECLARE
+  words TEXT[] := ARRAY['coffee', 'milk', 'diapers', 'tuition', 'rent', 'grab', 'pho', 'toys',
+                        'electricity', 'water', 'internet', 'groceries', 'pharmacy', 'books',
+                        'petrol', 'haircut', 'gift', 'shoes', 'bakery', 'cinema'];
+  queries TEXT[] := ARRAY['coffee', 'tuition', 'cofee', 'diaper', 'electricty', 'annie toys',
+                          'pho bakery', 'internet bill', 'zzz no match'];
+  household UUID;
+  category UUID;
+  q TEXT;
+  started TIMESTAMPTZ;
+  runs INTEGER := 20;
+  i INTEGER;
+BEGIN
+  INSERT INTO public.households (name) VALUES ('bench search') RETURNING id INTO household;
+  INSERT INTO public.categories (household_id, name, monthly_budget)
+  VALUES (household, 'bench', 1000000) RETURNING id INTO category;
+
+  INSERT INTO public.transactions (household_id, category_id, user_id, amount, description, date)
+  SELECT household, category, household, (random() * 500000)::NUMERIC(15,2),
+         words[1 + (random() * 19)::INTEGER] || ' ' || words[1 + (random() * 19)::INTEGER] || ' ' || g,
+         DATE '2016-01-01' + (random() * 3650)::INTEGER
+  FROM generate_series(1, 1000000) g;
+  ANALYZE public.transactions;
+
+  FOREACH q IN ARRAY queries LOOP
+    FOR i IN 1..runs LOOP
+      started := clock_timestamp();
+      PERFORM * FROM public.search_transactions(household, q, 20, 0);
+      INSERT INTO bench_timings VALUES (q, extract(epoch FROM clock_timestamp() - started) * 1000);
+    END LOOP;
+  END LOOP;
+END $$;
+
+SELECT query,
+       round(percentile_cont(0.5) WITHIN GROUP (ORDER BY ms)::NUMERIC, 3) AS p50_ms,
+       round(percentile_cont(0.95) WITHIN GROUP (ORDER BY ms)::NUMERIC, 3) AS p95_ms
+FROM bench_timings GROUP BY query ORDER BY p95_ms DESC;
+
+SELECT round(percentile_cont(0.95) WITHIN GROUP (ORDER BY ms)::NUMERIC, 3) AS overall_p95_ms,
+       percentile_cont(0.95) WITHIN GROUP (ORDER BY ms) < 100 AS meets_100ms_target
+FROM bench_timings;
+
+ROLLBACK;
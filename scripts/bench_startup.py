@@ -0,0 +1,104 @@
+"""Startup-time benchmark for Annie Budget.
+
+Measures per-module import time with ``python -X importtime``, checks that heavy
+SDKs stay lazily imported, and times the first render of pages that need no
+external services. Fails (exit code 1) when any number exceeds the budget in
+scripts/startup_budget.json.
+
+Usage: python scripts/bench_startup.py [--runs N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(ROOT, "scripts", "startup_budget.json")
+
+
+def measure_import_ms(module: str) -> float:
+    """Cumulative import time of one app module, excluding streamlit itself."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def find_eager_imports(modules: list, lazy_modules: list) -> list:
+    """Return the lazy modules that get imported as a side effect of importing the app."""
+    code = (
+        "import sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(','.join(m for m in {lazy_modules!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+class _NullQuery:
+    """Supabase client stand-in whose every query returns no rows."""
+    data = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+def measure_first_render_ms(page: str) -> float:
+    """Time the first run of a page script with an empty backend."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=30)
+    at.session_state["client"] = _NullQuery()
+    at.session_state["household_id"] = "00000000-0000-0000-0000-000000000000"
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].message}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="take the best of N runs")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+
+    over = []
+    print(f"{'check':<40} {'ms':>8} {'budget':>8}")
+    for module, limit in budget["import_ms"].items():
+        ms = min(measure_import_ms(module) for _ in range(args.runs))
+        print(f"{'import ' + module:<40} {ms:>8.1f} {limit:>8}")
+        if ms > limit:
+            over.append(f"import {module}")
+
+    for page, limit in budget["first_render_ms"].items():
+        ms = min(measure_first_render_ms(page) for _ in range(args.runs))
+        print(f"{'render ' + page:<40} {ms:>8.1f} {limit:>8}")
+        if ms > limit:
+            over.append(f"render {page}")
+
+    eager = find_eager_imports(list(budget["import_ms"]), budget["lazy_modules"])
+    for module in eager:
+        print(f"{module} is imported eagerly")
+        over.append(f"lazy {module}")
+
+    if over:
+        print(f"Over budget: {', '.join(over)}")
+        sys.exit(1)
+    print("Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+"""Concurrent-session load test for Annie Budget.
+
+Drives N simulated users through the real app script with Streamlit's AppTest,
+one process per session (AppTest swaps module-level Streamlit state such as
+st.secrets, so sessions can't share a process), against an in-memory Supabase
+stand-in served to every session by a multiprocessing manager and a canned
+Gemini model with configurable latency. Each session signs in through
+auth.require_login, adds transactions through the smart input, and browses
+months on the Monthly Transactions page.
+
+Reports throughput, p50/p95/p99 rerun latency and memory per session for each
+concurrency level. Memory is each session process's RSS growth over its
+scenario; caches the server would share between sessions are counted once per
+session here, so treat it as an upper bound.
+
+Runs from any directory; no secrets file is needed.
+
+Usage: python scripts/load_test.py [--sessions 1,5,10,25] [--iterations 5]
+                                   [--backend-ms 20] [--model-ms 400]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing.managers import BaseManager
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ENTRY_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "entry_queue.sqlite3"))
+
+PASSWORD = "load-test"
+
+# Stand-in for .streamlit/secrets.toml, handed to each AppTest
+SECRETS = {
+    "connections": {
+        "supabase": {"url": "http://load-test.invalid", "key": "load-test"},
+        "gemini": {"api_key": "load-test", "requests_per_minute": 1_000_000},
+    },
+    "operators": [],
+}
+
+# Filters travel to the backend process by name, so they must be plain data
+OPS = {
+    "eq": lambda a, b: a == b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "in": lambda a, b: a in b,
+}
+
+
+class FakeQuery:
+    """Just enough of the postgrest query builder for the app's queries.
+
+    Builds a plain-data spec that the shared backend executes.
+    """
+
+    def __init__(self, client, table):
+        self.client = client
+        self.spec = {
+            "table": table, "action": "select", "columns": "*", "filters": [], "payload": None,
+            "order_by": [], "offset": 0, "row_limit": None, "conflict_keys": None,
+        }
+
+    def select(self, columns="*"):
+        self.spec["columns"] = columns
+        return self
+
+    def _filter(self, column, op, value):
+        self.spec["filters"].append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", set(values))
+
+    def order(self, column, desc=False):
+        self.spec["order_by"].append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.spec["row_limit"] = count
+        return self
+
+    def range(self, start, end):
+        self.spec["offset"], self.spec["row_limit"] = start, end - start + 1
+        return self
+
+    def insert(self, rows):
+        self.spec["action"], self.spec["payload"] = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.spec["action"], self.spec["payload"] = "insert", rows
+        self.spec["conflict_keys"] = on_conflict.split(",") if on_conflict else None
+        return self
+
+    def update(self, data):
+        self.spec["action"], self.spec["payload"] = "update", data
+        return self
+
+    def delete(self):
+        self.spec["action"] = "delete"
+        return self
+
+    def execute(self):
+        time.sleep(self.client.latency)
+        return SimpleNamespace(data=self.client.backend.execute(self.spec))
+
+
+class FakeBackend:
+    """In-memory tables shared by all simulated sessions, served from the manager process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.tables = {name: [] for name in (
+            "households", "profiles", "categories", "transactions", "sessions",
+            "llm_usage", "recurring_transactions", "budget_alerts", "transactions_archive",
+            "transaction_summaries", "transaction_deletes",
+        )}
+        self.users = {}
+
+    def get_queries(self) -> int:
+        return self.queries
+
+    def user_id(self, email: str) -> str:
+        return self.users[email]
+
+    def defaults(self, table):
+        now = datetime.now(timezone.utc)
+        row = {"id": str(uuid.uuid4()), "created_at": now.isoformat()}
+        if table == "sessions":
+            row = {"token": str(uuid.uuid4()), "created_at": now.isoformat(),
+                   "expires_at": (now + timedelta(days=7)).isoformat()}
+        return row
+
+    def join(self, row, columns):
+        row = dict(row)
+        if "categories(" in columns:
+            category = next((c for c in self.tables["categories"] if c["id"] == row.get("category_id")), None)
+            row["categories"] = {"name": category["name"]} if category else None
+        if "profiles(" in columns:
+            profile = next((p for p in self.tables["profiles"] if p["id"] == row.get("user_id")), None)
+            row["profiles"] = {"display_name": profile["display_name"]} if profile else None
+        return row
+
+    def seed(self, sessions: int, months: int = 6, per_month: int = 60):
+        """Create two users per household, ten categories and some history."""
+        today = date.today()
+        for i in range(sessions):
+            if i % 2 == 0:
+                household_id = str(uuid.uuid4())
+                self.tables["households"].append({"id": household_id, "name": f"household {i // 2}", "invite_code": f"invite{i // 2}"})
+                category_ids = []
+                for name in ("Groceries", "Dining", "Transport", "Utilities", "Health",
+                             "Education", "Entertainment", "Shopping", "Hobbies", "Other"):
+                    category_id = str(uuid.uuid4())
+                    category_ids.append(category_id)
+                    self.tables["categories"].append({
+                        "id": category_id, "household_id": household_id, "name": name,
+                        "monthly_budget": 2_000_000, "is_fixed": name == "Utilities",
+                    })
+            user_id = str(uuid.uuid4())
+            email = f"user{i}@example.com"
+            self.users[email] = user_id
+            self.tables["profiles"].append({"id": user_id, "display_name": f"User {i}", "household_id": household_id})
+            for m in range(months):
+                month_start = date(today.year, today.month, 1) - timedelta(days=30 * m)
+                for n in range(per_month // 2):
+                    self.tables["transactions"].append({
+                        "id": str(uuid.uuid4()), "household_id": household_id, "user_id": user_id,
+                        "category_id": category_ids[n % len(category_ids)], "amount": 50_000 + n * 1000,
+                        "description": f"item {n}", "is_annie_related": n % 5 == 0,
+                        "date": (month_start + timedelta(days=n % 28)).isoformat(),
+                        "created_at": datetime.now(timezone.utc).isoformat(),
+                    })
+
+    def execute(self, spec: dict):
+        with self.lock:
+            self.queries += 1
+            return getattr(self, f"_{spec['action']}")(spec)
+
+    def count_rpc(self):
+        with self.lock:
+            self.queries += 1
+
+    @staticmethod
+    def _matches(spec, row):
+        return all(OPS[op](row.get(column), value) for column, op, value in spec["filters"])
+
+    def _select(self, spec):
+        rows = [r for r in self.tables[spec["table"]] if self._matches(spec, r)]
+        for column, desc in reversed(spec["order_by"]):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=desc)
+        rows = rows[spec["offset"]:]
+        if spec["row_limit"] is not None:
+            rows = rows[:spec["row_limit"]]
+        return [self.join(row, spec["columns"]) for row in rows]
+
+    def _insert(self, spec):
+        rows = spec["payload"] if isinstance(spec["payload"], list) else [spec["payload"]]
+        conflict_keys = spec["conflict_keys"]
+        inserted = []
+        table = self.tables[spec["table"]]
+        for row in rows:
+            if conflict_keys and any(
+                all(existing.get(k) == row.get(k) for k in conflict_keys) for existing in table
+            ):
+                continue
+            row = dict(self.defaults(spec["table"]), **row)
+            table.append(row)
+            inserted.append(dict(row))
+        return inserted
+
+    def _update(self, spec):
+        updated = []
+        for row in self.tables[spec["table"]]:
+            if self._matches(spec, row):
+                row.update(spec["payload"])
+                updated.append(dict(row))
+        return updated
+
+    def _delete(self, spec):
+        table = self.tables[spec["table"]]
+        deleted = [r for r in table if self._matches(spec, r)]
+        self.tables[spec["table"]] = [r for r in table if not self._matches(spec, r)]
+        return deleted
+
+
+class FakeSupabase:
+    """Per-process Supabase client talking to the shared FakeBackend."""
+
+    def __init__(self, backend, latency_ms: float):
+        self.backend = backend
+        self.latency = latency_ms / 1000
+        self.auth = SimpleNamespace(
+            sign_in_with_password=self._sign_in,
+            sign_up=lambda credentials: SimpleNamespace(user=None),
+            sign_out=lambda: None,
+        )
+
+    def _sign_in(self, credentials):
+        time.sleep(self.latency)
+        user_id = self.backend.user_id(credentials["email"])
+        return SimpleNamespace(user=SimpleNamespace(id=user_id, email=credentials["email"]))
+
+    def from_(self, table):
+        return FakeQuery(self, table)
+
+    def rpc(self, name, params):
+        client = self
+
+        class _Rpc:
+            def execute(self):
+                time.sleep(client.latency)
+                client.backend.count_rpc()
+                if name == "fixed_variable_spending":
+                    return SimpleNamespace(data={"fixed": 0, "variable": 0})
+                return SimpleNamespace(data=[])
+        return _Rpc()
+
+
+class BackendManager(BaseManager):
+    """Serves one FakeBackend to every session process."""
+
+
+BackendManager.register("FakeBackend", FakeBackend)
+
+
+class FakeModel:
+    """Gemini stand-in returning a fixed expense after a delay."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        text = json.dumps({"type": "expense", "amount": 50000, "description": "coffee",
+                           "category": "1", "is_annie_related": False, "date": None})
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(prompt_token_count=120, candidates_token_count=30))
+
+
+def install_stubs(client: FakeSupabase, model: FakeModel):
+    """Point the app's connection, model and limiter at the stand-ins.
+
+    gemini_client is patched as well as nlp_parser, since components import
+    the limiter and single-flight group from it directly.
+    """
+    import database
+    import gemini_client
+    import nlp_parser
+    from rate_limit import TokenBucket, SingleFlight
+
+    limiter = TokenBucket(rate_per_minute=1_000_000)
+    flight = SingleFlight()
+    database.get_connection = lambda: SimpleNamespace(client=client)
+    database.get_auth_client = lambda: client
+    for module in (gemini_client, nlp_parser):
+        module.get_gemini_model = lambda: model
+        module.get_rate_limiter = lambda: limiter
+        module.get_parse_flight = lambda: flight
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Session:
+    """One simulated user driving the app through AppTest."""
+
+    def __init__(self, index: int, root: str = ROOT):
+        from streamlit.testing.v1 import AppTest
+
+        self.email = f"user{index}@example.com"
+        self.latencies = []
+        self.errors = 0
+        self.at = AppTest.from_file(os.path.join(root, "app.py"), default_timeout=60)
+        self.at.secrets.update(SECRETS)
+
+    def _timed(self, action):
+        start = time.perf_counter()
+        action()
+        self.latencies.append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors += 1
+
+    def _button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def _widget(self, widgets, label):
+        return next(w for w in widgets if w.label == label)
+
+    def login(self):
+        self._timed(self.at.run)
+        self.at.text_input(key="signin_email").input(self.email)
+        self.at.text_input(key="signin_password").input(PASSWORD)
+        self._timed(self._button("Sign In").click().run)
+
+    def add_transaction(self, text: str):
+        self._widget(self.at.text_input, "Type naturally").input(text)
+        self._timed(self._button("Go").click().run)
+
+    def browse_months(self, count: int):
+        self._timed(self.at.switch_page("pages/1_Monthly_Transactions.py").run)
+        today = date.today()
+        for i in range(count):
+            month = (today.month - 1 - i) % 12 + 1
+            self._timed(self._widget(self.at.selectbox, "Month").set_value(month).run)
+        self._timed(self.at.switch_page("pages/0_Add_Transaction.py").run)
+
+    def scenario(self, iterations: int):
+        try:
+            self.login()
+            for i in range(iterations):
+                self.add_transaction(f"coffee {50 + i}k")
+                self.browse_months(3)
+        except Exception:
+            self.errors += 1
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def run_session(index: int, iterations: int, backend, backend_ms: float, model_ms: float, start, results):
+    """Process entry point for one simulated user.
+
+    Imports and a first render happen before the start barrier so the timed
+    scenario measures reruns, not interpreter startup.
+    """
+    try:
+        install_stubs(FakeSupabase(backend, backend_ms), FakeModel(model_ms))
+        Session(index).at.run()
+        session = Session(index)
+    except Exception:
+        start.abort()
+        raise
+    try:
+        start.wait(timeout=300)
+    except threading.BrokenBarrierError:
+        return
+    before = rss_bytes()
+    session.scenario(iterations)
+    results.put({"latencies": session.latencies, "errors": session.errors, "rss": rss_bytes() - before})
+
+
+def run_level(concurrency: int, iterations: int, backend, backend_ms: float, model_ms: float):
+    ctx = multiprocessing.get_context()
+    start = ctx.Barrier(concurrency + 1)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=run_session, args=(i, iterations, backend, backend_ms, model_ms, start, results))
+        for i in range(concurrency)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        start.wait(timeout=300)
+    except threading.BrokenBarrierError:
+        for p in processes:
+            p.terminate()
+        raise SystemExit("A session failed to start; see the traceback above")
+
+    began = time.perf_counter()
+    outcomes = [results.get() for _ in processes]
+    wall = time.perf_counter() - began
+    for p in processes:
+        p.join()
+
+    latencies = [t for o in outcomes for t in o["latencies"]]
+    return {
+        "sessions": concurrency,
+        "reruns": len(latencies),
+        "throughput": len(latencies) / wall,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "mb_per_session": statistics.mean(o["rss"] for o in outcomes) / 1024 / 1024,
+        "errors": sum(o["errors"] for o in outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated concurrency levels")
+    parser.add_argument("--iterations", type=int, default=5, help="add/browse cycles per session")
+    parser.add_argument("--backend-ms", type=float, default=20, help="simulated Supabase latency per query")
+    parser.add_argument("--model-ms", type=float, default=400, help="simulated Gemini latency per parse")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.sessions.split(",")]
+    manager = BackendManager()
+    manager.start()
+    backend = manager.FakeBackend()
+    backend.seed(max(levels))
+
+    print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'MB/sess':>8} {'errors':>7}")
+    for level in levels:
+        r = run_level(level, args.iterations, backend, args.backend_ms, args.model_ms)
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['throughput']:>8.1f} {r['p50']:>8.0f} "
+              f"{r['p95']:>8.0f} {r['p99']:>8.0f} {r['mb_per_session']:>8.1f} {r['errors']:>7}")
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
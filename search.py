@@ -0,0 +1,194 @@
+import re
+import threading
+import streamlit as st
+import database as db
+
+# Minimum share of query trigrams a description must contain to match
+MIN_SIMILARITY = 0.5
+# The Postgres search function stops counting matches here (see schema.sql)
+COUNT_CAP = 1000
+# Rows per sync request (PostgREST's default max-rows)
+SYNC_PAGE_SIZE = 1000
+
+
+def _trigrams(text: str) -> set:
+    """Split text into padded word trigrams (same scheme as pg_trgm)."""
+    grams = set()
+    for word in re.findall(r"\w+", (text or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SearchIndex:
+    """Incrementally maintained trigram inverted index over transaction descriptions.
+
+    Used when the Postgres search function is not available. Postings map each
+    trigram to the set of transaction ids containing it, so a query only touches
+    the rows sharing at least one trigram with it.
+    """
+
+    def __init__(self, household_id: str):
+        self.household_id = household_id
+        self._postings = {}
+        self._docs = {}
+        self._grams = {}
+        self._lock = threading.Lock()
+        self.watermark = None
+        self._archive_loaded = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, tx: dict):
+        """Add or replace a transaction in the index."""
+        with self._lock:
+            self._add(tx)
+
+    def update(self, tx_id: str, **fields):
+        """Apply an edit to an indexed transaction (no-op if it isn't indexed yet)."""
+        with self._lock:
+            if tx_id in self._docs:
+                self._add(dict(self._docs[tx_id], **fields))
+
+    def remove(self, tx_id: str):
+        """Remove a transaction from the index."""
+        with self._lock:
+            self._remove(tx_id)
+
+    def _add(self, tx: dict):
+        self._remove(tx["id"])
+        grams = _trigrams(tx.get("description"))
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(tx["id"])
+        self._docs[tx["id"]] = tx
+        self._grams[tx["id"]] = grams
+
+    def _remove(self, tx_id: str):
+        for gram in self._grams.pop(tx_id, ()):
+            ids = self._postings.get(gram)
+            if ids:
+                ids.discard(tx_id)
+                if not ids:
+                    del self._postings[gram]
+        self._docs.pop(tx_id, None)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0):
+        """Return (page of rows ranked by trigram similarity, total match count)."""
+        query_grams = _trigrams(query)
+        if not query_grams:
+            return [], 0
+
+        with self._lock:
+            hits = {}
+            for gram in query_grams:
+                for tx_id in self._postings.get(gram, ()):
+                    hits[tx_id] = hits.get(tx_id, 0) + 1
+
+            ranked = []
+            for tx_id, count in hits.items():
+                rank = count / len(query_grams)
+                if rank >= MIN_SIMILARITY:
+                    ranked.append((rank, self._docs[tx_id]))
+
+        ranked.sort(key=lambda r: (r[0], r[1].get("date") or ""), reverse=True)
+        page = [dict(tx, rank=rank) for rank, tx in ranked[offset:offset + limit]]
+        return page, len(ranked)
+
+    def sync(self, client):
+        """Pull transactions created since the last sync into the index.
+
+        The first sync also loads archived years, which the hot table's
+        created_at feed no longer returns.
+        """
+        if not self._archive_loaded:
+            try:
+                archived = db.get_archived_transactions(client, self.household_id, "1900-01-01", "9999-12-31")
+            except Exception as e:
+                if not _missing_function(e):
+                    raise
+                archived = []
+            for tx in archived:
+                self.add(_document(tx))
+            self._archive_loaded = True
+
+        while True:
+            rows = db.get_transactions_since(client, self.household_id, self.watermark, SYNC_PAGE_SIZE)
+            for tx in rows:
+                self.add(_document(tx))
+            if rows:
+                self.watermark = (rows[-1]["created_at"], rows[-1]["id"])
+            if len(rows) < SYNC_PAGE_SIZE:
+                break
+
+
+def _document(tx: dict) -> dict:
+    """Index entry for a transaction row with embedded category and profile names."""
+    return {
+        "id": tx["id"],
+        "date": tx.get("date"),
+        "amount": tx.get("amount"),
+        "description": tx.get("description"),
+        "is_annie_related": tx.get("is_annie_related"),
+        "category_name": (tx.get("categories") or {}).get("name"),
+        "display_name": (tx.get("profiles") or {}).get("display_name"),
+    }
+
+
+@st.cache_resource(ttl=3600)
+def get_search_index(_client, household_id: str):
+    """Get a household's local search index (rebuilt hourly to pick up edits made elsewhere)."""
+    return SearchIndex(household_id)
+
+
+# Set once the database has reported the search function missing; only then
+# is the local index worth building ahead of use
+_fallback_active = threading.Event()
+
+
+def _missing_function(error: Exception) -> bool:
+    """True when PostgREST reports the search function is not installed."""
+    return getattr(error, "code", None) == "PGRST202" or "Could not find the function" in str(error)
+
+
+def search_transactions(client, household_id: str, query: str, limit: int = 20, offset: int = 0):
+    """Search all transactions, preferring the indexed Postgres function.
+
+    Returns (rows, total_count); total_count stops at COUNT_CAP. Falls back to
+    the local inverted index only when the search function has not been
+    installed in the database; other errors are raised.
+    """
+    try:
+        rows = db.search_transactions(client, household_id, query, limit, offset)
+        total = rows[0]["total_count"] if rows else 0
+        return rows, total
+    except Exception as e:
+        if not _missing_function(e):
+            raise
+        _fallback_active.set()
+        index = get_search_index(client, household_id)
+        index.sync(client)
+        rows, total = index.search(query, limit, offset)
+        return rows, min(total, COUNT_CAP)
+
+
+def warm_index(client, household_id: str) -> bool:
+    """Build a household's local index ahead of use if searches are falling back to it.
+
+    Returns whether an index was synced.
+    """
+    if not _fallback_active.is_set():
+        return False
+    get_search_index(client, household_id).sync(client)
+    return True
+
+
+def transaction_updated(client, household_id: str, tx_id: str, **fields):
+    """Keep the local index in step with an edit made in this app."""
+    get_search_index(client, household_id).update(tx_id, **fields)
+
+
+def transaction_deleted(client, household_id: str, tx_id: str):
+    """Drop a deleted transaction from the local index."""
+    get_search_index(client, household_id).remove(tx_id)
@@ -0,0 +1,77 @@
+from datetime import date
+import streamlit as st
+import database as db
+
+# Longest range (in months) charted at each granularity before downsampling further
+MAX_MONTHLY_POINTS = 24
+MAX_QUARTERLY_POINTS = 60
+
+
+def month_start(year: int, month: int) -> date:
+    """First day of a month, normalising month overflow."""
+    index = year * 12 + (month - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@st.cache_data(ttl=86400)
+def _load_closed_totals(_client, household_id: str, start_date: str, end_date: str):
+    """Totals for closed months, which only change when someone edits history."""
+    return db.get_monthly_totals(_client, household_id, start_date, end_date)
+
+
+def invalidate_closed_totals(*tx_dates: str):
+    """Drop cached closed-month totals if a write is dated before the current month."""
+    today = date.today()
+    current = month_start(today.year, today.month).isoformat()
+    if any(tx_date and tx_date < current for tx_date in tx_dates):
+        _load_closed_totals.clear()
+
+
+def load_monthly_totals(client, household_id: str, start: date, end: date):
+    """Load grouped monthly totals for [start, end), caching months that have closed."""
+    today = date.today()
+    current = month_start(today.year, today.month)
+    rows = []
+    if start < current:
+        rows += _load_closed_totals(client, household_id, start.isoformat(), min(end, current).isoformat())
+    if end > current:
+        rows += db.get_monthly_totals(client, household_id, max(start, current).isoformat(), end.isoformat())
+    return rows
+
+
+def choose_granularity(months: int) -> str:
+    """Pick a chart granularity that keeps the number of points readable."""
+    if months <= MAX_MONTHLY_POINTS:
+        return "month"
+    if months <= MAX_QUARTERLY_POINTS:
+        return "quarter"
+    return "year"
+
+
+def build_trend_frame(rows, breakdown: str, labels: dict, granularity: str):
+    """Pivot grouped totals into a period x series frame for charting.
+
+    breakdown is "category", "user" or "annie"; labels maps ids to display names.
+    """
+    import pandas as pd
+
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows)
+    df["total"] = df["total"].astype(float)
+    month = pd.to_datetime(df["month"])
+    if granularity == "year":
+        df["period"] = month.dt.year.astype(str)
+    elif granularity == "quarter":
+        df["period"] = month.dt.year.astype(str) + " Q" + month.dt.quarter.astype(str)
+    else:
+        df["period"] = month.dt.strftime("%Y-%m")
+
+    if breakdown == "annie":
+        df["series"] = df["is_annie_related"].map({True: "Annie", False: "Household"})
+    else:
+        key = "category_id" if breakdown == "category" else "user_id"
+        df["series"] = df[key].map(lambda value: labels.get(value, "Other"))
+
+    return df.pivot_table(index="period", columns="series", values="total", aggfunc="sum", fill_value=0)